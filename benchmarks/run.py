@@ -0,0 +1,180 @@
+"""
+Benchmarks the nested create and update of `ManyToManySerializer`.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_once(scenario, serializers, params, trace_memory=False):
+    from django.db import connection, transaction
+
+    with transaction.atomic():
+        serializer = scenario(serializers, **params)
+
+        counter = QueryCounter()
+        if trace_memory:
+            tracemalloc.start()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            duration = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        transaction.set_rollback(True)
+
+    return duration, counter.count, peak
+
+
+def measure(scenario, serializers, params, repeat):
+    times = []
+    for _ in range(repeat):
+        duration, queries, _ = run_once(scenario, serializers, params)
+        times.append(duration)
+
+    # Tracing allocations slows everything down, so memory is measured apart
+    _, _, peak_memory = run_once(scenario, serializers, params, trace_memory=True)
+
+    return {
+        "time_min": min(times),
+        "time_median": statistics.median(times),
+        "queries": queries,
+        "peak_memory": peak_memory,
+    }
+
+
+def run(modes, repeat, name=None, max_depth=3):
+    import django
+    import rest_framework
+
+    import rest_serializers
+    from benchmarks.scenarios import get_scenarios
+    from benchmarks.serializers import SERIALIZERS
+
+    results = []
+    for mode in modes:
+        for scenario, params in get_scenarios(max_depth):
+            if name and scenario.__name__ != name:
+                continue
+            result = {"scenario": scenario.__name__, "mode": mode, "params": params}
+            result.update(measure(scenario, SERIALIZERS[mode], params, repeat))
+            results.append(result)
+            print(_format(result), file=sys.stderr)
+
+    return {
+        "versions": {
+            "rest_serializers": rest_serializers.__version__,
+            "django": django.get_version(),
+            "rest_framework": rest_framework.VERSION,
+            "python": platform.python_version(),
+        },
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _get_key(result):
+    return (
+        result["scenario"],
+        result["mode"],
+        tuple(sorted(result["params"].items())),
+    )
+
+
+def _format(result):
+    params = ", ".join("%s=%s" % item for item in sorted(result["params"].items()))
+    return "%-7s %-8s %-36s %9.2fms %6s queries %9.1fKiB" % (
+        result["scenario"],
+        result["mode"],
+        params,
+        result["time_min"] * 1000,
+        result["queries"],
+        result["peak_memory"] / 1024,
+    )
+
+
+def compare(before, after):
+    before_results = {_get_key(result): result for result in before["results"]}
+    for result in after["results"]:
+        previous = before_results.get(_get_key(result))
+        if previous is None:
+            continue
+        print(
+            "%s  time x%.2f  queries %+d  memory x%.2f"
+            % (
+                _format(result),
+                result["time_min"] / previous["time_min"],
+                result["queries"] - previous["queries"],
+                result["peak_memory"] / max(previous["peak_memory"], 1),
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--mode", choices=("default", "bulk"), action="append", dest="modes"
+    )
+    parser.add_argument("--scenario", help="only run this scenario")
+    parser.add_argument(
+        "--max-depth", type=int, default=3, help="nest the trees up to this depth"
+    )
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two runs"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (json.load(open(path)) for path in args.compare)
+        compare(before, after)
+        return
+
+    setup()
+    results = run(
+        args.modes or ["default", "bulk"], args.repeat, args.scenario, args.max_depth
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
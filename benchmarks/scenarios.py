@@ -0,0 +1,106 @@
+"""
+Each scenario creates the rows it needs and returns the serializer to save,
+the database is rolled back after every run.
+"""
+
+from tests.models import House, Node, Parent
+
+# The number of nodes below each node past the first level
+FANOUT = 5
+
+
+def _get_tree_data(breadth, depth):
+    def get_nodes(size, depth, prefix):
+        return [
+            {
+                "name": "%s%s" % (prefix, i),
+                "nodes": get_nodes(FANOUT, depth - 1, "%s%s." % (prefix, i)),
+            }
+            for i in range(size if depth else 0)
+        ]
+
+    return {"name": "Root", "nodes": get_nodes(breadth, depth, "Node ")}
+
+
+def create(serializers, breadth, depth):
+    return serializers["tree"](depth)(data=_get_tree_data(breadth, depth))
+
+
+def update(serializers, breadth, depth, delete_ratio):
+    root = Node.objects.create(name="Root")
+    levels = [[root]]
+    for level in range(depth):
+        size = breadth if level == 0 else FANOUT
+        levels.append(
+            Node.objects.bulk_create(
+                [
+                    Node(parent=node, name="%s.%s" % (node.name, i))
+                    for node in levels[-1]
+                    for i in range(size)
+                ]
+            )
+        )
+    nodes = {}
+    for level in levels[1:]:
+        for node in level:
+            nodes.setdefault(node.parent_id, []).append(node)
+
+    def get_nodes(node):
+        return [
+            {"id": child.pk, "name": child.name + "!", "nodes": get_nodes(child)}
+            for child in nodes.get(node.pk, [])
+        ]
+
+    # Rows are deleted from the first level, with the nodes below them
+    kept = nodes.get(root.pk, [])[int(breadth * delete_ratio) :]
+    data = {
+        "id": root.pk,
+        "name": "Root",
+        "nodes": [
+            {"id": node.pk, "name": node.name + "!", "nodes": get_nodes(node)}
+            for node in kept
+        ],
+    }
+    return serializers["tree"](depth)(root, data=data)
+
+
+def m2m(serializers, size, delete_ratio):
+    parents = Parent.objects.bulk_create(
+        [Parent(name="Parent %s" % i) for i in range(size // 2)]
+    )
+    house = House.objects.create(name="House")
+    house.parents.add(*parents)
+
+    kept = parents[int(len(parents) * delete_ratio) :]
+    data = {
+        "id": house.pk,
+        "name": "House",
+        "parents": [{"id": parent.pk, "name": parent.name} for parent in kept]
+        + [{"name": "New %s" % i} for i in range(size - len(parents))],
+    }
+    return serializers["house"](house, data=data)
+
+
+def get_scenarios(max_depth=3):
+    """
+    The `(scenario, params)` grid, trees are nested from one level to
+    `max_depth` levels deep.
+    """
+    depths = range(1, max_depth + 1)
+    scenarios = [
+        (create, {"breadth": breadth, "depth": depth})
+        for breadth in (10, 50, 200)
+        for depth in depths
+    ]
+    scenarios += [
+        (update, {"breadth": breadth, "depth": depth, "delete_ratio": delete_ratio})
+        for breadth in (10, 50, 200)
+        for depth in depths
+        for delete_ratio in (0, 0.5)
+    ]
+    scenarios += [
+        (m2m, {"size": size, "delete_ratio": delete_ratio})
+        for size in (10, 100, 500)
+        for delete_ratio in (0, 0.5)
+    ]
+    return scenarios
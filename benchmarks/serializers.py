@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import House, Node, Parent
+
+
+class NodeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Node
+        fields = ("id", "name")
+
+
+@lru_cache
+def get_tree_serializer(depth):
+    """
+    The serializer of a node with `depth` levels of nodes nested below it.
+    """
+    if depth == 0:
+        return NodeSerializer
+
+    class TreeSerializer(ManyToManySerializer):
+        nodes = get_tree_serializer(depth - 1)(many=True, required=False)
+
+        class Meta:
+            model = Node
+            fields = ("id", "name", "nodes")
+
+    return TreeSerializer
+
+
+@lru_cache
+def get_bulk_tree_serializer(depth):
+    class BulkTreeSerializer(get_tree_serializer(depth)):
+        BULK_REVERSE_RELATIONS = True
+        REUSE_NESTED_SERIALIZERS = True
+
+    return BulkTreeSerializer
+
+
+class HouseParentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+
+
+class HouseSerializer(ManyToManySerializer):
+    parents = HouseParentSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "parents")
+
+
+class BulkHouseSerializer(HouseSerializer):
+    BULK_REVERSE_RELATIONS = True
+    REUSE_NESTED_SERIALIZERS = True
+
+
+SERIALIZERS = {
+    "default": {"tree": get_tree_serializer, "house": HouseSerializer},
+    "bulk": {"tree": get_bulk_tree_serializer, "house": BulkHouseSerializer},
+}
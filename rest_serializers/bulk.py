@@ -0,0 +1,249 @@
+from functools import lru_cache
+
+from django.db import connections, router
+from rest_framework.serializers import (
+    BaseSerializer,
+    ModelSerializer,
+    raise_errors_on_nested_writes,
+)
+from rest_framework.utils import model_meta
+
+from rest_serializers.cache import invalidate
+from rest_serializers.settings import get_setting
+from rest_serializers.utils import chunked
+
+
+def can_bulk_save(serializer):
+    """
+    Only serializers that rely on the stock `ModelSerializer` save, create and
+    update can be written in bulk, anything else must go through its own `save`.
+    """
+    serializer_class = serializer.__class__
+    model_class = serializer.Meta.model
+    return (
+        serializer_class.save is BaseSerializer.save
+        and serializer_class.create is ModelSerializer.create
+        and serializer_class.update is ModelSerializer.update
+        and not model_class._meta.parents
+    )
+
+
+def build_instance(serializer, validated_data):
+    """
+    Mirror of `ModelSerializer.create` and `ModelSerializer.update` that applies
+    the validated data to an instance without saving it.
+
+    Returns the instance and the many-to-many values to set once it is saved.
+    """
+    model_class = serializer.Meta.model
+    info = model_meta.get_field_info(model_class)
+
+    many_to_many = {}
+    for field_name, relation_info in info.relations.items():
+        if relation_info.to_many and (field_name in validated_data):
+            many_to_many[field_name] = validated_data.pop(field_name)
+
+    if serializer.instance is None:
+        raise_errors_on_nested_writes("create", serializer, validated_data)
+        return model_class(**validated_data), many_to_many
+
+    raise_errors_on_nested_writes("update", serializer, validated_data)
+    instance = serializer.instance
+    for attr, value in validated_data.items():
+        setattr(instance, attr, value)
+    return instance, many_to_many
+
+
+@lru_cache(maxsize=None)
+def get_unique_together(model_class):
+    """
+    The sets of field names a model keeps unique besides its primary key, from
+    `unique` fields, `unique_together` and unconditional `UniqueConstraint`s.
+    """
+    opts = model_class._meta
+    unique_together = [
+        (field.name,)
+        for field in opts.concrete_fields
+        if field.unique and not field.primary_key
+    ]
+    unique_together.extend(tuple(names) for names in opts.unique_together)
+    unique_together.extend(
+        tuple(constraint.fields) for constraint in opts.total_unique_constraints
+    )
+    return unique_together
+
+
+def has_unique_constraint(model_class, field_names):
+    """
+    Whether the model keeps `field_names` unique together, which an upsert
+    needs to find its conflicts.
+    """
+    field_names = set(field_names)
+    return any(set(names) == field_names for names in get_unique_together(model_class))
+
+
+def _get_unique_keys(instance, unique_together):
+    opts = instance._meta
+    keys = set()
+    for names in unique_together:
+        values = tuple(
+            getattr(instance, opts.get_field(name).attname) for name in names
+        )
+        # Nulls never clash
+        if None not in values:
+            keys.add((names, values))
+    return keys
+
+
+def _get_chained_updates(updates):
+    """
+    The instances of `(instance, old_keys)` that take unique values another
+    instance of the list holds until it is updated, such as renaming `c` to
+    `d` and then `a` to `c`. A single UPDATE checks the constraint row by row,
+    so these are updated one at a time in the order of the data. Empty when
+    there is no such chain.
+    """
+    held = {}
+    for instance, old_keys in updates:
+        for key in old_keys:
+            held[key] = instance
+
+    changed = []
+    chained = False
+    for instance, old_keys in updates:
+        new_keys = _get_unique_keys(instance, [names for names, _ in old_keys])
+        if new_keys == old_keys:
+            continue
+        changed.append(instance)
+        chained = chained or any(
+            held.get(key, instance) is not instance for key in new_keys - old_keys
+        )
+    return changed if chained else []
+
+
+def bulk_write(model_class, rows, unique_fields=None):
+    """
+    Save `(serializer, validated_data)` pairs of the same model, where the
+    validated data has already been prepared for saving.
+
+    New instances are written with one `bulk_create` and existing ones with one
+    `bulk_update`. Like `bulk_create` itself this does not call `Model.save`
+    or send the `pre_save` and `post_save` signals.
+
+    With `unique_fields` new instances are upserted where the database can and
+    the model has a unique constraint on exactly those fields, a row with the
+    same values for them is updated rather than inserted again.
+    """
+    concrete_fields = {field.name for field in model_class._meta.concrete_fields}
+    unique_together = get_unique_together(model_class)
+
+    to_create = []
+    to_update = []
+    create_fields = set()
+    update_fields = set()
+    many_to_many = []
+
+    unique_updates = []
+
+    for serializer, validated_data in rows:
+        if serializer.instance is not None and unique_together:
+            # Read before the validated data is set on the instance
+            unique_updates.append(
+                (
+                    serializer.instance,
+                    _get_unique_keys(serializer.instance, unique_together),
+                )
+            )
+        instance, m2m = build_instance(serializer, validated_data)
+
+        if serializer.instance is None:
+            to_create.append(instance)
+            create_fields.update(concrete_fields.intersection(validated_data))
+        else:
+            to_update.append(instance)
+            update_fields.update(concrete_fields.intersection(validated_data))
+
+        serializer.instance = instance
+        if m2m:
+            many_to_many.append((instance, m2m))
+
+    manager = model_class._default_manager
+    batch_size = get_setting("WRITE_CHUNK_SIZE")
+    # Updates go first, so a new row can take a unique value an existing row
+    # gives up, as it can when the rows are saved one at a time
+    if to_update and update_fields:
+        update_fields = sorted(update_fields)
+        chained = _get_chained_updates(unique_updates)
+        chained_ids = {id(instance) for instance in chained}
+        in_bulk = [
+            instance for instance in to_update if id(instance) not in chained_ids
+        ]
+        if in_bulk:
+            manager.bulk_update(in_bulk, update_fields, batch_size=batch_size)
+        for instance in chained:
+            manager.bulk_update([instance], update_fields)
+
+    if to_create:
+        connection = connections[router.db_for_write(model_class)]
+        features = connection.features
+        if (
+            unique_fields
+            and getattr(features, "supports_update_conflicts_with_target", False)
+            and has_unique_constraint(model_class, unique_fields)
+        ):
+            upsert(manager, to_create, unique_fields, create_fields)
+        elif features.can_return_rows_from_bulk_insert:
+            manager.bulk_create(to_create, batch_size=batch_size)
+        else:
+            # The primary keys are needed to write back to the data
+            for instance in to_create:
+                instance.save(force_insert=True)
+
+    if to_create or to_update:
+        # No `post_save` is sent for bulk writes
+        invalidate(model_class)
+
+    for instance, m2m in many_to_many:
+        for field_name, value in m2m.items():
+            getattr(instance, field_name).set(value)
+
+    return [serializer.instance for serializer, _ in rows]
+
+
+def upsert(manager, instances, unique_fields, update_fields):
+    """
+    Insert the instances with one query, the rows that conflict on
+    `unique_fields` are updated with the values of `update_fields` instead.
+    """
+    update_fields = sorted(set(update_fields).difference(unique_fields, ["pk"]))
+    batch_size = get_setting("WRITE_CHUNK_SIZE")
+    if update_fields:
+        manager.bulk_create(
+            instances,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+            batch_size=batch_size,
+        )
+    else:
+        manager.bulk_create(instances, ignore_conflicts=True, batch_size=batch_size)
+
+    # Depending on the database and the version of Django the primary keys
+    # of upserted rows may not be returned, they are read back by unique fields
+    missing = [instance for instance in instances if instance.pk is None]
+    opts = manager.model._meta
+    attnames = [opts.get_field(name).attname for name in unique_fields]
+    for chunk in chunked(missing, get_setting("READ_CHUNK_SIZE")):
+        pks = {
+            tuple(row[1:]): row[0]
+            for row in manager.filter(
+                **{
+                    "%s__in" % attname: {getattr(obj, attname) for obj in chunk}
+                    for attname in attnames
+                }
+            ).values_list("pk", *attnames)
+        }
+        for instance in chunk:
+            instance.pk = pks.get(
+                tuple(getattr(instance, attname) for attname in attnames)
+            )
@@ -0,0 +1,225 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.db.models import signals
+from rest_framework import serializers
+
+from rest_serializers.utils import get_model_field
+
+try:
+    from django.db.models import FieldDoesNotExist
+except ImportError:
+    from django.core.exceptions import FieldDoesNotExist
+
+MISSING = object()
+
+# The backends caching representations that read each model
+_backends = defaultdict(set)
+_lock = threading.Lock()
+
+
+class BaseCache:
+    """
+    Stores representations and the version counter of each model, a change to a
+    model bumps its version and so changes the keys of every representation
+    that reads it.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def get_versions(self, labels):
+        raise NotImplementedError
+
+    def incr_version(self, label):
+        raise NotImplementedError
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class LRUCache(BaseCache):
+    """
+    In-process cache, the least recently used representations are evicted past
+    `max_size` entries. They are kept pickled, as Django's local memory cache
+    does, so every hit returns a copy the caller may change.
+    """
+
+    def __init__(self, max_size=1024):
+        super().__init__()
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.versions = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+                return value
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_versions(self, labels):
+        return tuple(self.versions[label] for label in labels)
+
+    def incr_version(self, label):
+        with self.lock:
+            self.versions[label] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class DjangoCache(BaseCache):
+    """
+    Cache on one of the `CACHES` of the settings, shared between processes.
+    """
+
+    def __init__(self, alias="default", timeout=None, key_prefix="rest_serializers"):
+        super().__init__()
+        self.alias = alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _get_version_key(self, label):
+        return "%s:version:%s" % (self.key_prefix, label)
+
+    def get(self, key):
+        value = self.cache.get("%s:%s" % (self.key_prefix, key), MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.cache.set("%s:%s" % (self.key_prefix, key), value, self.timeout)
+
+    def get_versions(self, labels):
+        keys = [self._get_version_key(label) for label in labels]
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # Start evicted counters anywhere but where they were
+                self.cache.add(key, time.time_ns(), None)
+                versions[key] = self.cache.get(key)
+        return tuple(versions[key] for key in keys)
+
+    def incr_version(self, label):
+        key = self._get_version_key(label)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, time.time_ns(), None)
+
+
+def invalidate(model_class):
+    """
+    Bump the version of a model in the caches of the representations that read
+    it, for changes made without signals such as bulk writes.
+    """
+    for backend in list(_backends.get(model_class, ())):
+        backend.incr_version(model_class._meta.label)
+
+
+def _invalidate_sender(sender, **kwargs):
+    invalidate(sender)
+
+
+def _invalidate_m2m(sender, instance, model, **kwargs):
+    invalidate(instance.__class__)
+    invalidate(model)
+
+
+def get_serializer_models(serializer, model_class):
+    """
+    The models read by `serializer` and the serializers nested in it, and the
+    through models of the many-to-manys it follows.
+    """
+    models = {model_class}
+    through_models = set()
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        related_model = None
+        current = model_class
+        for attr in field.source_attrs:
+            try:
+                model_field = get_model_field(current, attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation or model_field.related_model is None:
+                break
+
+            if model_field.many_to_many:
+                # The reverse side knows the through model, the field its relation
+                through = getattr(model_field, "through", None)
+                through_models.add(through or model_field.remote_field.through)
+            current = related_model = model_field.related_model
+            models.add(related_model)
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if related_model is not None and isinstance(
+            nested, serializers.ModelSerializer
+        ):
+            nested_models, nested_through = get_serializer_models(nested, related_model)
+            models |= nested_models
+            through_models |= nested_through
+
+    return models, through_models
+
+
+def register(backend, models, through_models):
+    """
+    Bump the versions of `models` in `backend` whenever they are saved or
+    deleted, or their many-to-manys change.
+    """
+    with _lock:
+        for model_class in models:
+            _backends[model_class].add(backend)
+            uid = "rest_serializers.cache.%s" % model_class._meta.label
+            signals.post_save.connect(
+                _invalidate_sender, sender=model_class, dispatch_uid=uid
+            )
+            signals.post_delete.connect(
+                _invalidate_sender, sender=model_class, dispatch_uid=uid
+            )
+        for through in through_models:
+            signals.m2m_changed.connect(
+                _invalidate_m2m,
+                sender=through,
+                dispatch_uid="rest_serializers.cache.%s" % through._meta.label,
+            )
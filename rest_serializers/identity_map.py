@@ -0,0 +1,40 @@
+from collections import defaultdict
+
+from rest_serializers.settings import get_setting
+from rest_serializers.utils import chunked
+
+
+class IdentityMap:
+    """
+    The instances loaded during one save by model and primary key, so a row
+    found in several branches of the nested data is fetched once and every
+    branch works on the same instance.
+    """
+
+    def __init__(self):
+        self.instances = defaultdict(dict)
+
+    def get(self, model_class, pk):
+        return self.instances[model_class].get(str(pk))
+
+    def add(self, model_class, instances):
+        known = self.instances[model_class]
+        for instance in instances:
+            known.setdefault(str(instance.pk), instance)
+
+    def fetch(self, model_class, pk_list, queryset=None):
+        """
+        The instances of `pk_list` by primary key, the ones not already in the
+        map are read on `queryset`, `READ_CHUNK_SIZE` at a time.
+        """
+        known = self.instances[model_class]
+        pk_list = {str(pk) for pk in pk_list}
+        missing = pk_list.difference(known)
+
+        if missing:
+            if queryset is None:
+                queryset = model_class.objects.all()
+            for chunk in chunked(missing, get_setting("READ_CHUNK_SIZE")):
+                self.add(model_class, queryset.filter(pk__in=chunk))
+
+        return {pk: known[pk] for pk in pk_list if pk in known}
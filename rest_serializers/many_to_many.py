@@ -0,0 +1,78 @@
+from django.db import router
+from django.db.models import signals
+
+from rest_serializers.cache import invalidate
+from rest_serializers.settings import get_setting
+from rest_serializers.utils import chunked
+
+
+def can_diff(manager):
+    """
+    Whether the many-to-many of a related manager can be written straight to
+    its through table, which holds nothing but the two foreign keys.
+    """
+    return manager.through._meta.auto_created and not manager.symmetrical
+
+
+def _send(manager, action, pk_set, using):
+    signals.m2m_changed.send(
+        sender=manager.through,
+        action=action,
+        instance=manager.instance,
+        reverse=manager.reverse,
+        model=manager.model,
+        pk_set=pk_set,
+        using=using,
+    )
+
+
+def diff_many_to_many(manager, targets, remove=False):
+    """
+    Make the many-to-many of a related manager hold `targets`.
+
+    The ids already in the through table are read with one query, the missing
+    rows are inserted with one `bulk_create` and, with `remove`, the rows of
+    targets not in the list are removed with one delete per `DELETE_CHUNK_SIZE`. `m2m_changed` is sent
+    as `add` and `remove` would when it has receivers.
+    """
+    through = manager.through
+    opts = through._meta
+    source_attname = opts.get_field(manager.source_field_name).attname
+    target_attname = opts.get_field(manager.target_field_name).attname
+    source_id = manager.related_val[0]
+    db = router.db_for_write(through, instance=manager.instance)
+
+    rows = through._default_manager.using(db).filter(**{source_attname: source_id})
+    existing = set(rows.values_list(target_attname, flat=True))
+
+    target_ids = {target.pk for target in targets}
+    to_add = target_ids - existing
+    to_remove = existing - target_ids if remove else set()
+    send = signals.m2m_changed.has_listeners(through)
+
+    if to_add:
+        if send:
+            _send(manager, "pre_add", to_add, db)
+        through._default_manager.using(db).bulk_create(
+            [
+                through(**{source_attname: source_id, target_attname: pk})
+                for pk in to_add
+            ],
+            ignore_conflicts=True,
+            batch_size=get_setting("WRITE_CHUNK_SIZE"),
+        )
+        if send:
+            _send(manager, "post_add", to_add, db)
+
+    if to_remove:
+        if send:
+            _send(manager, "pre_remove", to_remove, db)
+        for chunk in chunked(to_remove, get_setting("DELETE_CHUNK_SIZE")):
+            rows.filter(**{"%s__in" % target_attname: chunk}).delete()
+        if send:
+            _send(manager, "post_remove", to_remove, db)
+
+    if (to_add or to_remove) and not send:
+        # Nothing was told about the change, the caches are bumped here
+        invalidate(manager.instance.__class__)
+        invalidate(manager.model)
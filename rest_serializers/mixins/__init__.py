@@ -1,4 +1,4 @@
 from .base import BaseNestedModelSerializer
 from .create import NestedCreateMixin
-from .eager_loading import EagerLoadingMixin
+from .eager_loading import EagerListSerializer, EagerLoadingMixin
 from .update import NestedUpdateMixin
@@ -1,8 +1,10 @@
-from collections import OrderedDict, defaultdict
+import copy
+from collections import OrderedDict, defaultdict, namedtuple
 
 from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import ForeignKey
+from django.core.exceptions import ValidationError
+from django.db import models
 from django.db.models.fields.related import ForeignObjectRel
 
 try:
@@ -17,63 +19,281 @@ try:
 except ImportError:
     from django.core.exceptions import FieldDoesNotExist
 
-from rest_serializers.validators import LazyUniqueTogetherValidator
+from rest_serializers.identity_map import IdentityMap
+from rest_serializers.many_to_many import can_diff, diff_many_to_many
+from rest_serializers.planner import LevelPlanner, can_plan
+from rest_serializers.settings import get_setting
+from rest_serializers.utils import call_atomic, chunked, is_unchanged
+from rest_serializers.validators import LazyUniqueTogetherValidator, ParentField
+
+# A writable nested field: `direct` is false for reverse relations, `kind` is
+# one of "many_to_one", "one_to_one", "many_to_many" or "generic" and `many`
+# whether the field is a list of `serializer_class`
+Relation = namedtuple(
+    "Relation",
+    [
+        "field_name",
+        "source",
+        "related_field",
+        "direct",
+        "kind",
+        "many",
+        "serializer_class",
+    ],
+)
+
+
+def _get_prefetch_cache_name(instance, related_field, field_source):
+    if isinstance(related_field, GenericRelation):
+        # The generic manager would look its content type up to tell
+        return related_field.attname
+
+    # Many-to-many managers name their cache, reverse foreign keys use the
+    # accessor name of the relation
+    manager = getattr(instance, field_source)
+    cache_name = getattr(manager, "prefetch_cache_name", None)
+    if cache_name is None:
+        remote_field = manager.field.remote_field
+        cache_name = getattr(remote_field, "cache_name", None)
+        if cache_name is None:
+            cache_name = remote_field.get_cache_name()
+    return cache_name
+
+
+def _get_reverse_one_to_one(instance, field_source):
+    # The relation of the descriptor, which caches the related instance
+    return getattr(getattr(type(instance), field_source, None), "related", None)
+
+
+def _get_cached_related(instance, related_field, field_source):
+    if instance is None or instance.pk is None:
+        return None
+
+    if related_field.one_to_one:
+        related = _get_reverse_one_to_one(instance, field_source)
+        if related is None or not related.is_cached(instance):
+            return None
+        return [related.get_cached_value(instance)]
+
+    cache = getattr(instance, "_prefetched_objects_cache", {})
+    cache_name = _get_prefetch_cache_name(instance, related_field, field_source)
+    if cache_name not in cache:
+        return None
+    return cache[cache_name]
+
+
+def _get_natural_key(key_fields, data, save_kwargs):
+    # The values of the key as they are stored, `None` when one is missing
+    key = []
+    for key_field in key_fields:
+        if key_field.name in save_kwargs:
+            value = save_kwargs[key_field.name]
+        elif key_field.name in data:
+            value = data[key_field.name]
+        elif key_field.attname in data:
+            value = data[key_field.attname]
+        else:
+            return None
+
+        if key_field.is_relation:
+            if isinstance(value, models.Model):
+                value = value.pk
+            key_field = key_field.target_field
+        try:
+            key.append(key_field.to_python(value))
+        except ValidationError:
+            return None
+    return tuple(key)
+
+
+def get_nested_lookups(field, related_data, prefix=""):
+    """
+    The lookups to prefetch the reverse relations and many-to-manys nested in
+    the rows of `field`, at every depth the data goes to.
+    """
+    if not hasattr(field, "get_relation_plan"):
+        return []
+
+    lookups = []
+    for relation in field.get_relation_plan():
+        if relation.direct and not relation.many:
+            continue
+
+        rows = []
+        for d in related_data:
+            nested_data = d.get(relation.field_name) if isinstance(d, dict) else None
+            if isinstance(nested_data, list):
+                rows.extend(nested_data)
+            elif isinstance(nested_data, dict):
+                rows.append(nested_data)
+        if not rows:
+            continue
+
+        lookup = prefix + relation.source
+        lookups.append(lookup)
+        nested = field.fields[relation.field_name]
+        if relation.many:
+            nested = nested.child
+        lookups.extend(get_nested_lookups(nested, rows, lookup + "__"))
+    return lookups
 
 
 class BaseNestedModelSerializer(serializers.ModelSerializer):
+    # Validate the rows of the reverse relations first and then write them with
+    # `bulk_create` / `bulk_update`, one depth of the nested tree at a time,
+    # rather than calling `save` for each row
+    BULK_REVERSE_RELATIONS = False
+
+    # Build the serializer of each nested field once for the whole tree and
+    # validate every row with it, rather than building one for each row
+    REUSE_NESTED_SERIALIZERS = False
+
+    # Write many-to-manys against their through table: one query for the ids
+    # already there, one insert for the missing rows and, on update, one delete
+    # for the stale ones, rather than `add` and `remove`
+    DIFF_MANY_TO_MANY = False
+
+    # Don't save nested rows whose validated data matches the instance already
+    # stored, clients often send the whole tree back after editing one value
+    SKIP_UNCHANGED_ROWS = False
+
+    # Share one identity map between all the nested serializers of a save, in
+    # `context["identity_map"]`, so a row found in several branches of the
+    # data is fetched once
+    IDENTITY_MAP = False
+
+    # Write the rows of generic relations with `bulk_create` / `bulk_update`,
+    # as `BULK_REVERSE_RELATIONS` does for all the relations, and remove the
+    # stale ones with a single DELETE when nothing cascades from them
+    BULK_GENERIC_RELATIONS = False
+
     def _extract_relations(self, validated_data):
         reverse_relations = OrderedDict()
         relations = OrderedDict()
+        fields = self.fields
 
         # Remove related fields from validated data for future manipulations
-        for field_name, field in self.fields.items():
-            if field.read_only:
-                continue
-            try:
-                related_field, direct = self._get_related_field(field)
-            except FieldDoesNotExist:
+        for relation in self.get_relation_plan():
+            if relation.source not in validated_data:
+                # Skip field if field is not required
                 continue
 
-            if isinstance(field, serializers.ListSerializer) and isinstance(
-                field.child, serializers.ModelSerializer
-            ):
-                if field.source not in validated_data:
-                    # Skip field if field is not required
-                    continue
+            field = fields[relation.field_name]
 
-                validated_data.pop(field.source)
-
-                reverse_relations[field_name] = (
-                    related_field,
+            if relation.many:
+                validated_data.pop(relation.source)
+                reverse_relations[relation.field_name] = (
+                    relation.related_field,
                     field.child,
-                    field.source,
+                    relation.source,
                 )
+                continue
 
-            if isinstance(field, serializers.ModelSerializer):
-                if field.source not in validated_data:
-                    # Skip field if field is not required
+            if validated_data.get(relation.source) is None:
+                if relation.direct:
+                    # Don't process null value for direct relations
+                    # Native create/update processes these values
                     continue
 
-                if validated_data.get(field.source) is None:
-                    if direct:
-                        # Don't process null value for direct relations
-                        # Native create/update processes these values
-                        continue
-
-                validated_data.pop(field.source)
-                # Reversed one-to-one looks like direct foreign keys
-                # but they are reverse relations
-                if direct:
-                    relations[field_name] = (field, field.source)
-                else:
-                    reverse_relations[field_name] = (related_field, field, field.source)
+            validated_data.pop(relation.source)
+            # Reversed one-to-one looks like direct foreign keys
+            # but they are reverse relations
+            if relation.direct:
+                relations[relation.field_name] = (field, relation.source)
+            else:
+                reverse_relations[relation.field_name] = (
+                    relation.related_field,
+                    field,
+                    relation.source,
+                )
 
         return relations, reverse_relations
 
+    def get_relation_plan(self):
+        """
+        The writable nested fields of the serializer and the model fields they
+        relate to.
+
+        The plan is worked out once per serializer class and cached, fields that
+        are changed dynamically give a different key and their own plan.
+        """
+        fields = self.fields
+        key = tuple(
+            (
+                field_name,
+                field.__class__,
+                getattr(field, "child", None).__class__,
+                field.source,
+                field.read_only,
+            )
+            for field_name, field in fields.items()
+        )
+
+        serializer_class = self.__class__
+        plans = serializer_class.__dict__.get("_relation_plans")
+        if plans is None:
+            plans = {}
+            serializer_class._relation_plans = plans
+
+        plan = plans.get(key)
+        if plan is None:
+            plan = plans[key] = self._build_relation_plan(fields)
+        return plan
+
+    def _build_relation_plan(self, fields):
+        plan = []
+        for field_name, field in fields.items():
+            if field.read_only:
+                continue
+
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, serializers.ModelSerializer):
+                continue
+
+            try:
+                related_field, direct = self._get_related_field(field)
+            except FieldDoesNotExist:
+                continue
+
+            if isinstance(related_field, GenericRelation):
+                kind = "generic"
+            elif related_field.many_to_many:
+                kind = "many_to_many"
+            elif related_field.one_to_one:
+                kind = "one_to_one"
+            else:
+                kind = "many_to_one"
+
+            plan.append(
+                Relation(
+                    field_name,
+                    field.source,
+                    related_field,
+                    direct,
+                    kind,
+                    many,
+                    nested.__class__,
+                )
+            )
+        return tuple(plan)
+
+    @classmethod
+    def get_content_type(cls, model_class, for_concrete_model=True, using=None):
+        """
+        The content type of a model on the database `using`, from the cache
+        Django keeps of them per database.
+        """
+        return ContentType.objects.db_manager(using).get_for_model(
+            model_class, for_concrete_model=for_concrete_model
+        )
+
     def _get_generic_lookup(self, instance, related_field):
         return {
-            related_field.content_type_field_name: ContentType.objects.get_for_model(
-                instance
+            related_field.content_type_field_name: self.get_content_type(
+                instance.__class__,
+                related_field.for_concrete_model,
+                using=instance._state.db,
             ),
             related_field.object_id_field_name: instance.pk,
         }
@@ -106,34 +326,352 @@ class BaseNestedModelSerializer(serializers.ModelSerializer):
 
         return None
 
-    def _get_serializer_field(self, field, instance):
-        if isinstance(field, ForeignKey):
-            new_field = serializers.PrimaryKeyRelatedField(
-                queryset=field.related_model._default_manager.get_queryset(),
-                default=instance.pk,
-            )
-            return new_field
-
     def _get_serializer_for_field(self, field, **kwargs):
         kwargs.update({"context": self.context, "partial": self.partial})
-        return field.__class__(**kwargs)
+        serializer = field.__class__(**kwargs)
+        # Not bound to a parent, keep the field it stands for so its path in
+        # the tree is known
+        serializer._nested_field = field
+        return serializer
+
+    def _reuses_nested_serializers(self):
+        # Serializers built from a pool carry on using it for their own fields
+        return self.REUSE_NESTED_SERIALIZERS or "_serializer_pool" in self.__dict__
+
+    def _get_related_serializer(self, field, obj, data):
+        if self._reuses_nested_serializers():
+            return self._get_pooled_serializer(field, obj, data)
+
+        return self._get_serializer_for_field(field, instance=obj, data=data)
 
-    def prefetch_related_instances(self, field, related_data):
+    def _get_pooled_serializer(self, field, obj, data):
+        # The pool is handed down to the nested serializers so the whole tree
+        # builds one serializer per nested field
+        pool = self.__dict__.setdefault("_serializer_pool", {})
+        serializer = pool.get(field)
+
+        if serializer is None:
+            serializer = self._get_serializer_for_field(field, instance=obj, data=data)
+            serializer._serializer_pool = pool
+            pool[field] = serializer
+        else:
+            serializer.instance = obj
+            serializer.initial_data = data
+            for attr in ("_validated_data", "_errors", "_data"):
+                serializer.__dict__.pop(attr, None)
+
+        return serializer
+
+    def _detach_related_serializer(self, serializer):
+        """
+        A pooled serializer is reset for the next row, keep a copy of a
+        validated row that is saved later.
+        """
+        if self._reuses_nested_serializers():
+            return copy.copy(serializer)
+        return serializer
+
+    def _get_lazy_unique_validators(self, field):
+        # If the LazyUniqueTogetherValidator is being used it means there is
+        # a unique together, and one field of the related instances is
+        # missing and is the current instance.
+        # This can only be validated post save so its done here, for all
+        # the rows at once.
+        return [
+            validator
+            for validator in field.validators
+            if isinstance(validator, LazyUniqueTogetherValidator)
+        ]
+
+    def _add_parent_fields(self, field, serializer, save_kwargs):
+        """
+        Give the row the values of `save_kwargs` its lazy unique together
+        misses, such as its parent, so `validate()` sees them too.
+        """
+        field_names = {
+            field_name
+            for validator in self._get_lazy_unique_validators(field)
+            for field_name in validator.fields
+        }
+        fields = serializer.fields
+        for field_name in field_names & save_kwargs.keys():
+            # A pooled serializer may have it from a row of another parent
+            current = fields.get(field_name)
+            if current is None or isinstance(current, ParentField):
+                fields[field_name] = ParentField(default=save_kwargs[field_name])
+
+    def validate_unique_together(self, field, rows):
+        """
+        Check the lazy unique together of a nested field for a list of
+        validated `(serializer, save_kwargs)`.
+        """
+        validators = self._get_lazy_unique_validators(field)
+        if not validators:
+            return
+
+        attrs = [
+            ({**serializer.validated_data, **save_kwargs}, serializer.instance)
+            for serializer, save_kwargs in rows
+        ]
+        for validator in validators:
+            validator.validate_rows(attrs)
+
+    def _iter_valid_related(
+        self, field, related_data, instances, save_kwargs, direct_instances=None
+    ):
+        """
+        Yields `(data, serializer)` once each row is valid.
+
+        Rows are validated one at a time as they are consumed, unless there is a
+        unique together to check across all of them first.
+        """
         model_class = field.Meta.model
+        check_unique = bool(self._get_lazy_unique_validators(field))
+
+        rows = []
+        for data in related_data:
+            obj = instances.get(self._get_related_pk(data, model_class))
+            serializer = self._get_related_serializer(field, obj, data)
+            serializer._direct_instances = direct_instances
+            self._add_parent_fields(field, serializer, save_kwargs)
+            serializer.is_valid(raise_exception=True)
+            if not check_unique:
+                yield data, serializer
+                continue
+            rows.append((data, self._detach_related_serializer(serializer)))
+
+        if rows:
+            self.validate_unique_together(
+                field, [(serializer, save_kwargs) for _, serializer in rows]
+            )
+            yield from rows
+
+    def is_unchanged_row(self, serializer, save_kwargs):
+        """
+        Whether a validated nested row can be left as it is. Rows with nested
+        data, or whose serializer has its own create or update, are saved.
+        """
+        if not self.SKIP_UNCHANGED_ROWS or not can_plan(serializer):
+            return False
+        return is_unchanged(
+            serializer.instance, {**serializer.validated_data, **save_kwargs}
+        )
+
+    def prefetch_related_instances(self, field, related_data, cached=None):
+        """
+        The existing instances of the rows of `field` by primary key.
+
+        Instances in `cached`, as returned by `get_cached_related_instances`,
+        are used as they are. The others are fetched in one query, which also
+        prefetches the relations nested in the rows for the next depth.
+        """
+        model_class = field.Meta.model
+        cached = cached or {}
+        instances = {}
         pk_list = []
         for d in filter(None, related_data):
             pk = self._get_related_pk(d, model_class)
-            if pk:
+            if pk in cached:
+                instances[pk] = cached[pk]
+            elif pk:
                 pk_list.append(pk)
 
-        instances = {
+        if pk_list:
+            queryset = model_class.objects.all()
+            lookups = get_nested_lookups(field, related_data)
+            if lookups:
+                queryset = queryset.prefetch_related(*lookups)
+            instances.update(self.fetch_instances(model_class, pk_list, queryset))
+
+        return instances
+
+    def match_natural_keys(self, field, rows):
+        """
+        Give the rows of `field` that have no primary key the one of the
+        existing instance with the same natural key, the `NATURAL_KEY_FIELDS`
+        of the nested serializer, so they are updated rather than replaced.
+
+        `rows` are `(related_data, save_kwargs)`, the values of the key are
+        read from the save kwargs or the data. The matched instances are read
+        with one query per `READ_CHUNK_SIZE` rows and returned by primary key.
+        """
+        key_fields = getattr(field, "NATURAL_KEY_FIELDS", None)
+        if not key_fields:
+            return {}
+
+        model_class = field.Meta.model
+        key_fields = [model_class._meta.get_field(name) for name in key_fields]
+
+        pending = []
+        for related_data, save_kwargs in rows:
+            for d in related_data:
+                if not isinstance(d, dict) or self._get_related_pk(d, model_class):
+                    continue
+                key = _get_natural_key(key_fields, d, save_kwargs)
+                if key is not None:
+                    pending.append((d, key))
+
+        matched = {}
+        for chunk in chunked(pending, get_setting("READ_CHUNK_SIZE")):
+            values = defaultdict(set)
+            for _, key in chunk:
+                for key_field, value in zip(key_fields, key):
+                    values[key_field.attname].add(value)
+
+            existing = {
+                tuple(getattr(obj, key_field.attname) for key_field in key_fields): obj
+                for obj in model_class.objects.filter(
+                    **{"%s__in" % attname: value for attname, value in values.items()}
+                )
+            }
+
+            for d, key in chunk:
+                obj = existing.get(key)
+                if obj is not None:
+                    d["pk"] = obj.pk
+                    matched[str(obj.pk)] = obj
+        return matched
+
+    def get_cached_related_instances(self, parents, related_field, field_source):
+        """
+        The instances of a reverse relation already loaded on every one of
+        `parents`, by `prefetch_related` or, for one-to-ones, `select_related`.
+        `None` when the relation isn't loaded on one of them.
+        """
+        instances = {}
+        for parent in parents:
+            cached = _get_cached_related(parent, related_field, field_source)
+            if cached is None:
+                return None
+            instances.update(
+                (str(related_instance.pk), related_instance)
+                for related_instance in cached
+                if related_instance is not None
+            )
+        return instances
+
+    def clear_cached_related(self, instance, related_field, field_source):
+        # The relation was written, what was loaded before is stale
+        if related_field.one_to_one:
+            related = _get_reverse_one_to_one(instance, field_source)
+            if related is not None and related.is_cached(instance):
+                related.delete_cached_value(instance)
+        elif hasattr(instance, "_prefetched_objects_cache"):
+            cache_name = _get_prefetch_cache_name(instance, related_field, field_source)
+            instance._prefetched_objects_cache.pop(cache_name, None)
+
+    def prefetch_direct_instances(self, field, related_data):
+        """
+        The instances of the direct relations nested in the rows of `field`,
+        fetched with one query per related model for all the rows.
+        """
+        if not hasattr(field, "get_relation_plan"):
+            return {}
+
+        pk_lists = defaultdict(set)
+        for relation in field.get_relation_plan():
+            if not relation.direct or relation.many:
+                continue
+
+            related_model = relation.serializer_class.Meta.model
+            pk_list = pk_lists[related_model]
+            for d in filter(None, related_data):
+                nested_data = d.get(relation.field_name)
+                if not isinstance(nested_data, dict):
+                    continue
+                pk = self._get_related_pk(nested_data, related_model)
+                if pk:
+                    pk_list.add(pk)
+
+        return {
+            related_model: self.fetch_instances(related_model, pk_list)
+            for related_model, pk_list in pk_lists.items()
+            if pk_list
+        }
+
+    def _get_direct_instance(self, model_class, pk):
+        # Use the instances fetched for all the sibling rows when there are some
+        direct_instances = getattr(self, "_direct_instances", None) or {}
+        if model_class in direct_instances:
+            return direct_instances[model_class].get(pk)
+        return self.fetch_instances(model_class, [pk]).get(pk)
+
+    def fetch_instances(self, model_class, pk_list, queryset=None):
+        """
+        The instances of `pk_list` by primary key, through the identity map of
+        the save when there is one. Read `READ_CHUNK_SIZE` primary keys at a
+        time.
+        """
+        identity_map = self.context.get("identity_map")
+        if identity_map is not None:
+            return identity_map.fetch(model_class, pk_list, queryset)
+
+        if queryset is None:
+            queryset = model_class.objects.all()
+        return {
             str(related_instance.pk): related_instance
-            for related_instance in model_class.objects.filter(pk__in=pk_list)
+            for chunk in chunked(pk_list, get_setting("READ_CHUNK_SIZE"))
+            for related_instance in queryset.filter(pk__in=chunk)
         }
 
-        return instances
+    def get_reverse_related_data(
+        self, instance, field_name, related_field, field, field_source
+    ):
+        # Skip processing for empty data or not-specified field.
+        # The field can be defined in validated_data but isn't defined
+        # in initial_data (for example, if multipart form data used)
+        related_data = self.initial_data.get(field_name, None)
+        if related_data is None:
+            return None
+
+        # Expand to array of one item for one-to-one for uniformity
+        if related_field.one_to_one:
+            # If an object already exists, fill in the pk so
+            # we don't try to duplicate it
+            pk_name = field.Meta.model._meta.pk.attname
+            if pk_name not in related_data and "pk" in related_data:
+                pk_name = "pk"
+            if pk_name not in related_data:
+                related_instance = getattr(instance, field_source, None)
+                if related_instance:
+                    related_data[pk_name] = related_instance.pk
+
+            # Expand to array of one item for one-to-one for uniformity
+            related_data = [related_data]
+
+        return related_data
+
+    def get_reverse_save_kwargs(self, instance, field_name, related_field):
+        save_kwargs = self.get_save_kwargs(field_name)
+        if isinstance(related_field, GenericRelation):
+            save_kwargs.update(
+                self._get_generic_lookup(instance, related_field),
+            )
+        elif not related_field.many_to_many:
+            save_kwargs[related_field.name] = instance
+
+        return save_kwargs
 
     def update_or_create_reverse_relations(self, instance, reverse_relations):
+        if self.BULK_REVERSE_RELATIONS:
+            # Save the whole tree below the instance one depth at a time
+            LevelPlanner(self).save(instance, reverse_relations)
+            return
+
+        if self.BULK_GENERIC_RELATIONS:
+            generic_relations = OrderedDict(
+                (field_name, relation)
+                for field_name, relation in reverse_relations.items()
+                if isinstance(relation[0], GenericRelation)
+            )
+            if generic_relations:
+                LevelPlanner(self).save(instance, generic_relations)
+                reverse_relations = OrderedDict(
+                    (field_name, relation)
+                    for field_name, relation in reverse_relations.items()
+                    if field_name not in generic_relations
+                )
+
         # Update or create reverse relations:
         # many-to-one, many-to-many, reversed one-to-one
         for field_name, (
@@ -141,67 +679,59 @@ class BaseNestedModelSerializer(serializers.ModelSerializer):
             field,
             field_source,
         ) in reverse_relations.items():
-            # Skip processing for empty data or not-specified field.
-            # The field can be defined in validated_data but isn't defined
-            # in initial_data (for example, if multipart form data used)
-            related_data = self.initial_data.get(field_name, None)
+            related_data = self.get_reverse_related_data(
+                instance, field_name, related_field, field, field_source
+            )
             if related_data is None:
                 continue
 
-            # Expand to array of one item for one-to-one for uniformity
-            if related_field.one_to_one:
-                # If an object already exists, fill in the pk so
-                # we don't try to duplicate it
-                pk_name = field.Meta.model._meta.pk.attname
-                if pk_name not in related_data and "pk" in related_data:
-                    pk_name = "pk"
-                if pk_name not in related_data:
-                    related_instance = getattr(instance, field_source, None)
-                    if related_instance:
-                        related_data[pk_name] = related_instance.pk
-
-                # Expand to array of one item for one-to-one for uniformity
-                related_data = [related_data]
-
-            instances = self.prefetch_related_instances(field, related_data)
-
-            save_kwargs = self.get_save_kwargs(field_name)
-            if isinstance(related_field, GenericRelation):
-                save_kwargs.update(
-                    self._get_generic_lookup(instance, related_field),
-                )
-            elif not related_field.many_to_many:
-                save_kwargs[related_field.name] = instance
+            save_kwargs = self.get_reverse_save_kwargs(
+                instance, field_name, related_field
+            )
+            cached = self.get_cached_related_instances(
+                [instance], related_field, field_source
+            )
+            matched = self.match_natural_keys(field, [(related_data, save_kwargs)])
+            instances = self.prefetch_related_instances(
+                field, related_data, {**matched, **(cached or {})}
+            )
+            direct_instances = self.prefetch_direct_instances(field, related_data)
 
             new_related_instances = []
-            for data in related_data:
-                obj = instances.get(self._get_related_pk(data, field.Meta.model))
-                serializer = self._get_serializer_for_field(
-                    field, instance=obj, data=data
-                )
-
-                # If the LazyUniqueTogetherValidator is being used it means there i
-                # a unique together, and one field of the related instances is
-                # missing and is the current instance.
-                # This can only be validated post save so its done here.
-                # We need to dynamically add the field to the serializer so
-                # it can validated
-                if LazyUniqueTogetherValidator in [
-                    v.__class__ for v in serializer.validators
-                ]:
-                    missing_field = self._get_serializer_field(related_field, instance)
-                    if missing_field:
-                        serializer.fields[related_field.name] = missing_field
-
-                serializer.is_valid(raise_exception=True)
-                related_instance = serializer.save(**save_kwargs)
+            for data, serializer in self._iter_valid_related(
+                field, related_data, instances, save_kwargs, direct_instances
+            ):
+                if self.is_unchanged_row(serializer, save_kwargs):
+                    related_instance = serializer.instance
+                else:
+                    related_instance = serializer.save(**save_kwargs)
                 data["pk"] = related_instance.pk
                 new_related_instances.append(related_instance)
 
             if related_field.many_to_many:
-                # Add m2m instances to through model via add
-                m2m_manager = getattr(instance, field_source)
-                m2m_manager.add(*new_related_instances)
+                self.write_many_to_many(
+                    instance,
+                    field_source,
+                    new_related_instances,
+                    remove=self.instance is not None,
+                )
+            self.clear_cached_related(instance, related_field, field_source)
+
+    def diffs_many_to_many(self, instance, field_source):
+        return self.DIFF_MANY_TO_MANY and can_diff(getattr(instance, field_source))
+
+    def write_many_to_many(self, instance, field_source, related_instances, remove):
+        """
+        Add the related instances to a many-to-many. When it is diffed the rows
+        missing from `related_instances` are removed too if `remove` is set,
+        otherwise that is left to `delete_reverse_relations_if_need`.
+        """
+        m2m_manager = getattr(instance, field_source)
+        if self.diffs_many_to_many(instance, field_source):
+            diff_many_to_many(m2m_manager, related_instances, remove=remove)
+        else:
+            # Add m2m instances to through model via add
+            m2m_manager.add(*related_instances)
 
     def update_or_create_direct_relations(self, attrs, relations):
         for field_name, (field, field_source) in relations.items():
@@ -210,7 +740,7 @@ class BaseNestedModelSerializer(serializers.ModelSerializer):
             model_class = field.Meta.model
             pk = self._get_related_pk(data, model_class)
             if pk:
-                obj = model_class.objects.filter(pk=pk).first()
+                obj = self._get_direct_instance(model_class, pk)
             serializer = self._get_serializer_for_field(field, instance=obj, data=data)
             serializer.is_valid(raise_exception=True)
             attrs[field_source] = serializer.save(**self.get_save_kwargs(field_name))
@@ -225,4 +755,16 @@ class BaseNestedModelSerializer(serializers.ModelSerializer):
     def save(self, **kwargs):
         self.save_kwargs = defaultdict(dict, kwargs)
 
-        return super().save(**kwargs)
+        if not self.IDENTITY_MAP or "identity_map" in self.context:
+            return super().save(**kwargs)
+
+        # The map lives as long as the save, the next one reads fresh rows
+        self.context["identity_map"] = IdentityMap()
+        try:
+            return super().save(**kwargs)
+        finally:
+            del self.context["identity_map"]
+
+    async def asave(self, **kwargs):
+        # The whole nested save is one transaction, as with `save`
+        return await call_atomic(self.Meta.model, self.save, **kwargs)
@@ -1,3 +1,5 @@
+from rest_serializers.utils import call_atomic
+
 from .base import BaseNestedModelSerializer
 
 
@@ -18,3 +20,6 @@ class NestedCreateMixin(BaseNestedModelSerializer):
         self.update_or_create_reverse_relations(instance, reverse_relations)
 
         return instance
+
+    async def acreate(self, validated_data):
+        return await call_atomic(self.Meta.model, self.create, validated_data)
@@ -1,11 +1,383 @@
-class EagerLoadingMixin:
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from rest_serializers.cache import MISSING, get_serializer_models, register
+from rest_serializers.representation import (
+    compile_representation,
+    get_representation_plan,
+)
+from rest_serializers.streaming import iter_json, iter_representation
+from rest_serializers.utils import get_model_field
+from rest_serializers.values import ValuesReader, can_read_values
+
+try:
+    from django.db.models import FieldDoesNotExist
+except ImportError:
+    from django.core.exceptions import FieldDoesNotExist
+
+
+def _get_related_path(model_class, source_attrs):
+    """
+    The relations followed by `source_attrs` from `model_class`, as a lookup,
+    the model it ends on and whether any of them is to-many.
+    """
+    path = []
+    many = False
+    for attr in source_attrs:
+        try:
+            model_field = get_model_field(model_class, attr)
+        except FieldDoesNotExist:
+            break
+        if not model_field.is_relation:
+            break
+
+        path.append(attr)
+        many = many or model_field.many_to_many or model_field.one_to_many
+        model_class = model_field.related_model
+        if model_class is None:
+            # A generic foreign key can only be prefetched
+            return "__".join(path), None, True
+
+    return "__".join(path), model_class, many
+
+
+def get_fields_key(serializer):
+    """
+    A key of the fields of a serializer and of the serializers nested in it.
+    What is worked out from the fields is cached under it, so fields changed
+    dynamically get their own.
+    """
+    key = []
+    for field_name, field in serializer.fields.items():
+        child = getattr(field, "child", None)
+        nested = field if isinstance(field, serializers.Serializer) else child
+        key.append(
+            (
+                field_name,
+                field.__class__,
+                child.__class__,
+                field.source,
+                field.write_only,
+                (
+                    get_fields_key(nested)
+                    if isinstance(nested, serializers.Serializer)
+                    else None
+                ),
+            )
+        )
+    return tuple(key)
+
+
+def _get_nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.ModelSerializer):
+        return field
+    return None
+
+
+def get_eager_loading(serializer, model_class):
+    """
+    The `select_related` lookups and the `(lookup, queryset)` prefetches needed
+    to read the fields of `serializer` from instances of `model_class`.
+    """
+    select_related = []
+    prefetch_related = []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        source_attrs = field.source_attrs
+        if isinstance(field, serializers.RelatedField):
+            # Only the primary key is read from the related instance
+            if field.use_pk_only_optimization():
+                source_attrs = source_attrs[:-1]
+
+        path, related_model, many = _get_related_path(model_class, source_attrs)
+        if not path:
+            continue
+
+        nested = _get_nested_serializer(field)
+        if nested is None or related_model is None:
+            nested_select, nested_prefetch = [], []
+        else:
+            nested_select, nested_prefetch = get_eager_loading(nested, related_model)
+
+        if many:
+            queryset = None
+            if nested_select or nested_prefetch:
+                queryset = related_model._default_manager.select_related(
+                    *nested_select
+                ).prefetch_related(*_get_prefetch_objects(nested_prefetch))
+            prefetch_related.append((path, queryset))
+            continue
+
+        select_related.append(path)
+        select_related.extend("%s__%s" % (path, lookup) for lookup in nested_select)
+        prefetch_related.extend(
+            ("%s__%s" % (path, lookup), queryset)
+            for lookup, queryset in nested_prefetch
+        )
+
+    return select_related, prefetch_related
+
+
+def _get_prefetch_objects(prefetch_related):
+    # A lookup read by several fields is prefetched once, with a queryset if
+    # any of them needs one
+    querysets = {}
+    for lookup, queryset in prefetch_related:
+        if querysets.get(lookup) is None:
+            querysets[lookup] = queryset
+
+    return [
+        lookup if queryset is None else Prefetch(lookup, queryset=queryset)
+        for lookup, queryset in querysets.items()
+    ]
+
+
+class AsyncMixin:
+    """
+    Async counterparts of `is_valid` and `data`, for serializers and lists.
+    """
+
+    async def ais_valid(self, raise_exception=False):
+        return await sync_to_async(self.is_valid)(raise_exception=raise_exception)
+
+    async def adata(self):
+        """
+        The `data` of the serializer, read without blocking the event loop.
+        """
+        return await sync_to_async(lambda: self.data)()
+
+
+class EagerListSerializer(AsyncMixin, serializers.ListSerializer):
+    """
+    List serializer of the eager loading serializers, with their async methods.
+    """
+
+
+class EagerLoadingMixin(AsyncMixin):
     SELECT_RELATED_FIELDS = []
     PREFETCH_RELATED_FIELDS = []
 
+    # Work out the select and prefetch lookups from the declared fields, in
+    # addition to the ones listed above
+    AUTO_EAGER_LOADING = False
+
+    # Number of instances read and prefetched at a time when streaming
+    STREAM_CHUNK_SIZE = 2000
+
+    # Represent instances with a function worked out from the fields, when they
+    # are all plain model fields and nested serializers of plain model fields
+    COMPILED_REPRESENTATION = False
+
+    # A `rest_serializers.cache` backend to keep the representations in, they
+    # are invalidated when any model read by the serializer changes
+    REPRESENTATION_CACHE = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """
+        Lists get the async methods too, unless the Meta names its own class.
+        """
+        meta = getattr(cls, "Meta", None)
+        if hasattr(meta, "list_serializer_class"):
+            return super().many_init(*args, **kwargs)
+
+        list_kwargs = {}
+        # Only passed to the list, from DRF 3.15
+        for key in getattr(serializers, "LIST_SERIALIZER_KWARGS_REMOVE", ()):
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update(
+            {
+                key: value
+                for key, value in kwargs.items()
+                if key in serializers.LIST_SERIALIZER_KWARGS
+            }
+        )
+        return EagerListSerializer(*args, **list_kwargs)
+
+    @classmethod
+    def get_eager_loading(cls):
+        """
+        The `select_related` lookups and the `prefetch_related` lookups or
+        `Prefetch` objects needed by the fields of the serializer and of the
+        serializers nested in it.
+
+        They are worked out once per serializer class and cached.
+        """
+        eager_loading = cls.__dict__.get("_eager_loading")
+        if eager_loading is None:
+            select_related, prefetch_related = get_eager_loading(cls(), cls.Meta.model)
+            eager_loading = (
+                list(dict.fromkeys(select_related)),
+                _get_prefetch_objects(prefetch_related),
+            )
+            cls._eager_loading = eager_loading
+        return eager_loading
+
     @classmethod
     def setup_eager_loading(cls, queryset):
-        if cls.SELECT_RELATED_FIELDS:
-            queryset = queryset.select_related(*cls.SELECT_RELATED_FIELDS)
-        if cls.PREFETCH_RELATED_FIELDS:
-            queryset = queryset.prefetch_related(*cls.PREFETCH_RELATED_FIELDS)
+        select_related_fields = list(cls.SELECT_RELATED_FIELDS)
+        prefetch_related_fields = list(cls.PREFETCH_RELATED_FIELDS)
+
+        if cls.AUTO_EAGER_LOADING:
+            select_related, prefetch_related = cls.get_eager_loading()
+            select_related_fields.extend(
+                lookup
+                for lookup in select_related
+                if lookup not in select_related_fields
+            )
+            # Lookups listed by hand take precedence
+            listed = {
+                getattr(prefetch, "prefetch_to", prefetch)
+                for prefetch in prefetch_related_fields
+            }
+            prefetch_related_fields.extend(
+                prefetch
+                for prefetch in prefetch_related
+                if getattr(prefetch, "prefetch_to", prefetch) not in listed
+            )
+
+        if select_related_fields:
+            queryset = queryset.select_related(*select_related_fields)
+        if prefetch_related_fields:
+            queryset = queryset.prefetch_related(*prefetch_related_fields)
         return queryset
+
+    @classmethod
+    def stream(cls, queryset, chunk_size=None, context=None):
+        """
+        The representation of each instance of the eager loaded queryset, read
+        and prefetched in chunks rather than all at once as `.data` does.
+        """
+        return iter_representation(
+            cls(context=context or {}),
+            cls.setup_eager_loading(queryset),
+            chunk_size or cls.STREAM_CHUNK_SIZE,
+        )
+
+    @classmethod
+    def stream_json(cls, queryset, chunk_size=None, context=None):
+        """
+        As `stream`, rendered as a JSON list for a `StreamingHttpResponse`.
+        """
+        return iter_json(
+            cls(context=context or {}),
+            cls.setup_eager_loading(queryset),
+            chunk_size or cls.STREAM_CHUNK_SIZE,
+        )
+
+    def get_representation_plan(self):
+        """
+        The plan of `to_representation` for the fields of the serializer, or
+        `None` when they need the full `to_representation`.
+
+        The plan is worked out once per serializer class and cached, fields that
+        are changed dynamically give a different key and their own plan.
+        """
+        key = self.get_fields_key()
+        serializer_class = self.__class__
+        plans = serializer_class.__dict__.get("_representation_plans")
+        if plans is None:
+            plans = {}
+            serializer_class._representation_plans = plans
+
+        if key not in plans:
+            plans[key] = get_representation_plan(self, self.Meta.model)
+        return plans[key]
+
+    def get_fields_key(self):
+        # Worked out once per serializer, a list reuses its child for every row
+        key = self.__dict__.get("_fields_key")
+        if key is None:
+            key = self._fields_key = get_fields_key(self)
+        return key
+
+    def get_representation_cache_key(self, instance):
+        """
+        The key of the representation of an instance, made of the fields of the
+        serializer and the versions of every model they read, so a different
+        field set or any change to the models gives a new key.
+        """
+        # Read once per serializer, a list reuses its child for every row
+        prefix = self.__dict__.get("_cache_prefix")
+        if prefix is None:
+            serializer_class = self.__class__
+            fields_key = self.get_fields_key()
+            cache_labels = serializer_class.__dict__.get("_cache_labels")
+            if cache_labels is None:
+                cache_labels = serializer_class._cache_labels = {}
+
+            if fields_key not in cache_labels:
+                models, through_models = get_serializer_models(self, self.Meta.model)
+                register(self.REPRESENTATION_CACHE, models, through_models)
+                cache_labels[fields_key] = (
+                    hashlib.md5(repr(fields_key).encode()).hexdigest(),
+                    sorted(model_class._meta.label for model_class in models),
+                )
+
+            digest, labels = cache_labels[fields_key]
+            versions = self.REPRESENTATION_CACHE.get_versions(labels)
+            prefix = self._cache_prefix = "%s.%s:%s:%s" % (
+                serializer_class.__module__,
+                serializer_class.__qualname__,
+                digest,
+                ".".join(str(version) for version in versions),
+            )
+        return "%s:%s" % (prefix, instance.pk)
+
+    def to_representation(self, instance):
+        cache = self.REPRESENTATION_CACHE
+        if cache is None or getattr(instance, "pk", None) is None:
+            return self._to_representation(instance)
+
+        key = self.get_representation_cache_key(instance)
+        ret = cache.get(key)
+        if ret is MISSING:
+            ret = self._to_representation(instance)
+            cache.set(key, ret)
+        return ret
+
+    def _to_representation(self, instance):
+        if self.COMPILED_REPRESENTATION:
+            # Compiled once per serializer, a list reuses its child for each row
+            to_representation = self.__dict__.get("_compiled_representation")
+            if to_representation is None:
+                plan = self.get_representation_plan()
+                to_representation = False
+                if plan is not None:
+                    to_representation = compile_representation(self, plan)
+                self._compiled_representation = to_representation
+
+            if to_representation:
+                return to_representation(instance)
+
+        return super().to_representation(instance)
+
+    @classmethod
+    def read_values(cls, queryset, context=None):
+        """
+        The representation of the instances of the queryset, read with
+        `values_list` rather than from model instances.
+
+        Serializers without a representation plan, see
+        `get_representation_plan`, or with fields that need the attributes of
+        instances, see `can_read_values`, are read from the eager loaded
+        queryset.
+        """
+        serializer = cls(context=context or {})
+        plan = serializer.get_representation_plan()
+        if plan is None or not can_read_values(plan, cls.Meta.model):
+            return cls(
+                cls.setup_eager_loading(queryset), many=True, context=context or {}
+            ).data
+        return ValuesReader(serializer, plan, cls.Meta.model).read(queryset)
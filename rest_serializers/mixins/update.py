@@ -3,6 +3,9 @@ from collections import OrderedDict
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db.models.fields.related import ForeignObjectRel
 
+from rest_serializers.settings import get_setting
+from rest_serializers.utils import call_atomic, chunked, get_missing_pks
+
 from .base import BaseNestedModelSerializer
 
 
@@ -24,6 +27,9 @@ class NestedUpdateMixin(BaseNestedModelSerializer):
         self.delete_reverse_relations_if_need(instance, reverse_relations)
         return instance
 
+    async def aupdate(self, instance, validated_data):
+        return await call_atomic(self.Meta.model, self.update, instance, validated_data)
+
     def delete_reverse_relations_if_need(self, instance, reverse_relations):
         # Reverse `reverse_relations` for correct delete priority
         reverse_relations = OrderedDict(reversed(list(reverse_relations.items())))
@@ -34,6 +40,12 @@ class NestedUpdateMixin(BaseNestedModelSerializer):
             field,
             field_source,
         ) in reverse_relations.items():
+            if related_field.many_to_many and self.diffs_many_to_many(
+                instance, field_source
+            ):
+                # Already removed when the many-to-many was written
+                continue
+
             model_class = field.Meta.model
 
             related_data = self.initial_data[field_name]
@@ -53,15 +65,36 @@ class NestedUpdateMixin(BaseNestedModelSerializer):
                 related_field_lookup = {related_field.name: instance}
 
             current_ids = [d.get("pk") for d in related_data if d is not None]
-            pks_to_delete = list(
-                model_class.objects.filter(**related_field_lookup)
-                .exclude(pk__in=current_ids)
-                .values_list("pk", flat=True)
-            )
+            queryset = model_class.objects.filter(**related_field_lookup)
 
             if related_field.many_to_many:
                 # Remove relations from m2m table
+                chunk_size = get_setting("DELETE_CHUNK_SIZE")
                 m2m_manager = getattr(instance, field_source)
-                m2m_manager.remove(*pks_to_delete)
+                for pks_to_delete in chunked(
+                    get_missing_pks(queryset, current_ids, chunk_size), chunk_size
+                ):
+                    m2m_manager.remove(*pks_to_delete)
             else:
-                model_class.objects.filter(pk__in=pks_to_delete).delete()
+                self.delete_missing_instances(queryset, current_ids)
+
+    def delete_missing_instances(self, queryset, current_ids):
+        """
+        Delete the rows of the queryset whose primary key is not in `current_ids`.
+
+        Django deletes them with a single DELETE when nothing cascades from them
+        and no delete signals are connected. Past `DELETE_CHUNK_SIZE` current
+        rows, the stale ones are found by reading the primary keys of the
+        queryset and deleted in chunks.
+        """
+        chunk_size = get_setting("DELETE_CHUNK_SIZE")
+        if chunk_size is None or len(current_ids) <= chunk_size:
+            queryset.exclude(pk__in=current_ids).delete()
+            return
+
+        # Too many current rows to exclude them in one query
+        manager = queryset.model.objects
+        for pks_to_delete in chunked(
+            get_missing_pks(queryset, current_ids, chunk_size), chunk_size
+        ):
+            manager.filter(pk__in=pks_to_delete).delete()
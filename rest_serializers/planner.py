@@ -0,0 +1,406 @@
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+
+from django.contrib.contenttypes.fields import GenericRelation
+from rest_framework.exceptions import ValidationError
+
+from rest_serializers.bulk import bulk_write, can_bulk_save
+from rest_serializers.settings import get_setting
+from rest_serializers.utils import chunked, is_unchanged
+
+# One reverse relation of one saved instance, `owner` is the serializer that
+# declares the relation and `delete_stale` whether rows missing from the data
+# should be removed once the level is written
+Node = namedtuple(
+    "Node",
+    [
+        "owner",
+        "instance",
+        "field_name",
+        "related_field",
+        "field",
+        "field_source",
+        "related_data",
+        "save_kwargs",
+        "delete_stale",
+    ],
+)
+
+
+def _prune_errors(errors):
+    # Drop the rows without errors, what is left is reported like the errors
+    # of nested serializers
+    if isinstance(errors, dict):
+        pruned = {}
+        for key, value in errors.items():
+            value = _prune_errors(value)
+            if value:
+                pruned[key] = value
+        return pruned
+    if isinstance(errors, list):
+        pruned = [_prune_errors(item) for item in errors]
+        return pruned if any(pruned) else []
+    return errors
+
+
+@lru_cache(maxsize=None)
+def _nested_write_methods():
+    from rest_serializers.mixins import NestedCreateMixin, NestedUpdateMixin
+    from rest_serializers.mixins.base import BaseNestedModelSerializer
+    from rest_serializers.serializers import ManyToManySerializer
+
+    return (
+        BaseNestedModelSerializer.save,
+        {NestedCreateMixin.create, ManyToManySerializer.create},
+        {NestedUpdateMixin.update, ManyToManySerializer.update},
+    )
+
+
+def can_plan(serializer):
+    """
+    Whether the planner can write the serializer itself, either as a plain model
+    serializer or a nested serializer that uses the stock save, create and
+    update.
+    """
+    if can_bulk_save(serializer):
+        return True
+    if serializer.Meta.model._meta.parents:
+        return False
+    save_method, create_methods, update_methods = _nested_write_methods()
+    serializer_class = serializer.__class__
+    return (
+        serializer_class.save is save_method
+        and serializer_class.create in create_methods
+        and serializer_class.update in update_methods
+    )
+
+
+class LevelPlanner:
+    """
+    Saves a nested tree breadth first.
+
+    Every row found at one depth of the tree is validated and then written with
+    one bulk insert and one bulk update per model. The saved instances become
+    the parents of the next depth, so the number of queries grows with the depth
+    of the tree rather than with the number of rows in it.
+
+    Children that override create or update are saved with their own `save`.
+    """
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        # The errors of each item saved by `save_items`, and the errors of
+        # every validated row by id of its serializer, for its own rows to fill
+        self.errors = None
+        self.row_errors = {}
+
+    def save(self, instance, reverse_relations):
+        # Rows missing below the root are removed by the root itself
+        nodes = self.get_nodes(
+            self.serializer, instance, reverse_relations, delete_stale=False
+        )
+        while nodes:
+            nodes = self.save_level(nodes)
+
+    def save_items(self, serializers):
+        """
+        Saves the validated serializers of the items of a list as the first
+        depth of the tree. Rows found invalid below them are reported by item,
+        as the list reports its own validation errors.
+        """
+        self.errors = [{} for _ in serializers]
+        for serializer, errors in zip(serializers, self.errors):
+            self.row_errors[id(serializer)] = errors
+
+        children = self.write_rows(
+            [(None, serializer, {}) for serializer in serializers]
+        )
+        nodes = self.get_child_nodes(children)
+        while nodes:
+            nodes = self.save_level(nodes)
+
+        return [serializer.instance for serializer in serializers]
+
+    def get_nodes(self, owner, instance, reverse_relations, delete_stale):
+        nodes = []
+        for field_name, (
+            related_field,
+            field,
+            field_source,
+        ) in reverse_relations.items():
+            related_data = owner.get_reverse_related_data(
+                instance, field_name, related_field, field, field_source
+            )
+            if related_data is None:
+                continue
+
+            save_kwargs = owner.get_reverse_save_kwargs(
+                instance, field_name, related_field
+            )
+            nodes.append(
+                Node(
+                    owner,
+                    instance,
+                    field_name,
+                    related_field,
+                    field,
+                    field_source,
+                    related_data,
+                    save_kwargs,
+                    delete_stale,
+                )
+            )
+        return nodes
+
+    def prefetch(self, nodes):
+        # One query per relation for the whole level
+        grouped = defaultdict(list)
+        for node in nodes:
+            grouped[(node.owner.__class__, node.field_name)].append(node)
+
+        instances = {}
+        direct_instances = {}
+        for key, group in grouped.items():
+            owner = group[0].owner
+            related_data = [d for node in group for d in node.related_data]
+            cached = owner.get_cached_related_instances(
+                [node.instance for node in group],
+                group[0].related_field,
+                group[0].field_source,
+            )
+            matched = owner.match_natural_keys(
+                group[0].field,
+                [(node.related_data, node.save_kwargs) for node in group],
+            )
+            instances[key] = owner.prefetch_related_instances(
+                group[0].field, related_data, {**matched, **(cached or {})}
+            )
+            direct_instances[key] = owner.prefetch_direct_instances(
+                group[0].field, related_data
+            )
+        return instances, direct_instances
+
+    def save_level(self, nodes):
+        instances, direct_instances = self.prefetch(nodes)
+
+        # Validate every row of the level before anything is written
+        rows = []
+        grouped = defaultdict(list)
+        relations = {}
+        for node in nodes:
+            model_class = node.field.Meta.model
+            key = (node.owner.__class__, node.field_name)
+            relations.setdefault(key, node)
+            for index, data in enumerate(node.related_data):
+                obj = instances[key].get(node.owner._get_related_pk(data, model_class))
+                serializer = node.owner._get_related_serializer(node.field, obj, data)
+                serializer._direct_instances = direct_instances[key]
+                node.owner._add_parent_fields(node.field, serializer, node.save_kwargs)
+                if not self.validate(node, index, serializer):
+                    continue
+                serializer = node.owner._detach_related_serializer(serializer)
+                self.add_row_errors(node, index, serializer, {})
+                rows.append((node, data, serializer))
+                grouped[key].append((node, serializer))
+
+        # One unique together check per relation for the whole level
+        for key, group in grouped.items():
+            self.validate_unique_together(relations[key], group)
+
+        if self.errors is not None:
+            errors = [_prune_errors(item_errors) for item_errors in self.errors]
+            if any(errors):
+                raise ValidationError(errors)
+
+        children = self.write_rows(
+            [(node.owner, serializer, node.save_kwargs) for node, _, serializer in rows]
+        )
+
+        saved = defaultdict(list)
+        for node, data, serializer in rows:
+            data["pk"] = serializer.instance.pk
+            saved[id(node)].append(serializer.instance)
+
+        for node in nodes:
+            if node.related_field.many_to_many:
+                # The root removes its own stale rows, as `delete_stale` says
+                # for the levels below it
+                remove = node.delete_stale or (
+                    node.owner is self.serializer
+                    and self.serializer.instance is not None
+                )
+                node.owner.write_many_to_many(
+                    node.instance, node.field_source, saved[id(node)], remove
+                )
+            node.owner.clear_cached_related(
+                node.instance, node.related_field, node.field_source
+            )
+
+        self.delete_stale(nodes)
+        return self.get_child_nodes(children)
+
+    def validate(self, node, index, serializer):
+        if self.errors is None:
+            serializer.is_valid(raise_exception=True)
+            return True
+
+        if serializer.is_valid():
+            return True
+        self.add_row_errors(node, index, serializer, serializer.errors)
+        return False
+
+    def validate_unique_together(self, relation, group):
+        owner = relation.owner
+        try:
+            owner.validate_unique_together(
+                relation.field,
+                [(serializer, node.save_kwargs) for node, serializer in group],
+            )
+        except ValidationError:
+            if self.errors is None:
+                raise
+        else:
+            return
+
+        # Check the rows of each parent apart to find the ones at fault
+        nodes = {}
+        rows = defaultdict(list)
+        for node, serializer in group:
+            nodes[id(node)] = node
+            rows[id(node)].append((serializer, node.save_kwargs))
+        for node_id, node_rows in rows.items():
+            node = nodes[node_id]
+            try:
+                owner.validate_unique_together(node.field, node_rows)
+            except ValidationError as exc:
+                self.row_errors[id(node.owner)][node.field_name] = exc.detail
+
+    def add_row_errors(self, node, index, serializer, errors):
+        # The errors of a row go where the owner reports the rows of the field
+        if self.errors is None:
+            return
+
+        owner_errors = self.row_errors[id(node.owner)]
+        if node.related_field.one_to_one:
+            owner_errors[node.field_name] = errors
+        else:
+            field_errors = owner_errors.setdefault(
+                node.field_name, [{} for _ in node.related_data]
+            )
+            field_errors[index] = errors
+        self.row_errors[id(serializer)] = errors
+
+    def write_rows(self, rows):
+        """
+        Writes the validated `(owner, serializer, save_kwargs)` rows with one
+        bulk insert and one bulk update per model and returns the reverse
+        relations of each, which are written with the next depth.
+        """
+        to_write = defaultdict(list)
+        natural_keys = {}
+        children = []
+        for owner, serializer, save_kwargs in rows:
+            if not can_plan(serializer):
+                serializer.save(**save_kwargs)
+                continue
+
+            existing = serializer.instance is not None
+            validated_data = {**serializer.validated_data, **save_kwargs}
+            reverse_relations = self.prepare(serializer, save_kwargs, validated_data)
+            if not (
+                owner is not None
+                and owner.SKIP_UNCHANGED_ROWS
+                and is_unchanged(serializer.instance, validated_data)
+            ):
+                # Unchanged rows are left out, their own nested rows are not
+                to_write[serializer.Meta.model].append((serializer, validated_data))
+                natural_keys.setdefault(
+                    serializer.Meta.model,
+                    getattr(serializer, "NATURAL_KEY_FIELDS", None),
+                )
+            if reverse_relations:
+                children.append((serializer, reverse_relations, existing))
+
+        for model_class, model_rows in to_write.items():
+            bulk_write(model_class, model_rows, natural_keys[model_class])
+
+        return children
+
+    def get_child_nodes(self, children):
+        next_nodes = []
+        for serializer, reverse_relations, existing in children:
+            next_nodes.extend(
+                self.get_nodes(
+                    serializer,
+                    serializer.instance,
+                    reverse_relations,
+                    delete_stale=existing,
+                )
+            )
+        return next_nodes
+
+    def prepare(self, serializer, save_kwargs, validated_data):
+        """
+        Does what the nested create and update do before saving the instance
+        itself and returns the reverse relations, which are written with the
+        next depth.
+        """
+        if not hasattr(serializer, "_extract_relations"):
+            return None
+
+        # Same as `BaseNestedModelSerializer.save`
+        serializer.save_kwargs = defaultdict(dict, save_kwargs)
+        relations, reverse_relations = serializer._extract_relations(validated_data)
+        serializer.update_or_create_direct_relations(validated_data, relations)
+        return reverse_relations
+
+    def delete_stale(self, nodes):
+        grouped = defaultdict(list)
+        for node in nodes:
+            if node.delete_stale and hasattr(node.owner, "delete_missing_instances"):
+                grouped[(node.owner.__class__, node.field_name)].append(node)
+
+        for group in grouped.values():
+            node = group[0]
+            related_field = node.related_field
+
+            if related_field.many_to_many:
+                for node in group:
+                    node.owner.delete_reverse_relations_if_need(
+                        node.instance,
+                        {
+                            node.field_name: (
+                                related_field,
+                                node.field,
+                                node.field_source,
+                            )
+                        },
+                    )
+                continue
+
+            # One query for the relation across every parent of the level, or
+            # of each chunk of `DELETE_CHUNK_SIZE` parents
+            for chunk in chunked(group, get_setting("DELETE_CHUNK_SIZE")):
+                if isinstance(related_field, GenericRelation):
+                    lookup = node.owner._get_generic_lookup(
+                        node.instance, related_field
+                    )
+                    lookup.pop(related_field.object_id_field_name)
+                    lookup["%s__in" % related_field.object_id_field_name] = [
+                        node.instance.pk for node in chunk
+                    ]
+                else:
+                    lookup = {
+                        "%s__in" % related_field.name: [node.instance for node in chunk]
+                    }
+
+                current_ids = [
+                    d.get("pk")
+                    for node in chunk
+                    for d in node.related_data
+                    if d is not None
+                ]
+                model_class = node.field.Meta.model
+                node.owner.delete_missing_instances(
+                    model_class.objects.filter(**lookup), current_ids
+                )
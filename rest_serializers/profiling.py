@@ -0,0 +1,155 @@
+import sys
+import time
+from collections import Counter, OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import serializers
+
+# One query run while profiling, `path` is the dotted path of the nested field
+# that ran it, empty for the root serializer and for queries run outside one
+QueryRecord = namedtuple("QueryRecord", ["path", "sql", "duration"])
+
+
+def get_field_path(field):
+    """
+    The dotted path of a field from the root serializer.
+
+    Nested serializers built by the nested mixins to save a row are not bound
+    to a parent, the field they were built from is followed instead.
+    """
+    names = []
+    while field is not None:
+        if field.field_name:
+            names.append(field.field_name)
+        parent = field.parent
+        if parent is None:
+            parent = field.__dict__.get("_nested_field")
+        field = parent
+    return ".".join(reversed(names))
+
+
+def _get_current_field(frame):
+    while frame is not None:
+        field = frame.f_locals.get("self")
+        if isinstance(field, serializers.Field):
+            return field
+        frame = frame.f_back
+    return None
+
+
+class QueryProfile:
+    """
+    Records the queries run through a connection, with their duration and the
+    nested field that ran them.
+
+    Use it with `profile_queries`.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        field = _get_current_field(sys._getframe(1))
+        path = get_field_path(field) if field is not None else ""
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries.append(QueryRecord(path, sql, duration))
+
+    def by_path(self):
+        queries = OrderedDict()
+        for query in self.queries:
+            queries.setdefault(query.path, []).append(query)
+        return queries
+
+    def count(self, path=None):
+        return len(self._filter(path))
+
+    def duration(self, path=None):
+        return sum(query.duration for query in self._filter(path))
+
+    def _filter(self, path):
+        if path is None:
+            return self.queries
+        return [query for query in self.queries if query.path == path]
+
+    def get_repeated(self, threshold=2):
+        """
+        The queries of the same shape run at least `threshold` times by one
+        nested field, as `{(path, sql): count}`. These are the N+1 suspects.
+        """
+        counts = Counter((query.path, query.sql) for query in self.queries)
+        return {key: count for key, count in counts.items() if count >= threshold}
+
+    def check_budget(self, budget):
+        """
+        The errors for a budget, an int for the total number of queries or a
+        dict of the maximum number of queries per path.
+        """
+        if not isinstance(budget, dict):
+            budget = {None: budget}
+
+        errors = []
+        for path, limit in budget.items():
+            count = self.count(path)
+            if count > limit:
+                errors.append(
+                    "%s: %s queries, %s allowed"
+                    % ("total" if path is None else path or "<root>", count, limit)
+                )
+        return errors
+
+    def report(self):
+        lines = []
+        for path, queries in self.by_path().items():
+            lines.append(
+                "%s: %s queries in %.2fms"
+                % (
+                    path or "<root>",
+                    len(queries),
+                    sum(query.duration for query in queries) * 1000,
+                )
+            )
+        for (path, sql), count in self.get_repeated().items():
+            lines.append("repeated %s times in %s: %s" % (count, path or "<root>", sql))
+        return "\n".join(lines)
+
+
+@contextmanager
+def profile_queries(using=DEFAULT_DB_ALIAS):
+    """
+    Profile the queries run on a connection within the block.
+
+        with profile_queries() as profile:
+            serializer.data
+        profile.get_repeated()
+    """
+    profile = QueryProfile()
+    with connections[using].execute_wrapper(profile):
+        yield profile
+
+
+@contextmanager
+def assert_query_budget(budget, using=DEFAULT_DB_ALIAS, allow_repeated=True):
+    """
+    Fail when the block runs more queries than the budget, see
+    `QueryProfile.check_budget`, or repeats a query shape for one nested field
+    unless `allow_repeated`.
+    """
+    with profile_queries(using) as profile:
+        yield profile
+
+    errors = profile.check_budget(budget)
+    if not allow_repeated:
+        errors.extend(
+            "%s: query repeated %s times: %s" % (path or "<root>", count, sql)
+            for (path, sql), count in profile.get_repeated().items()
+        )
+    if errors:
+        raise AssertionError(
+            "Query budget exceeded\n%s\n\n%s" % ("\n".join(errors), profile.report())
+        )
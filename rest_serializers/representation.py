@@ -0,0 +1,181 @@
+from collections import namedtuple
+from functools import lru_cache
+from operator import attrgetter
+
+from rest_framework import relations, serializers
+from rest_framework.fields import CharField, Field, IntegerField
+
+from rest_serializers.utils import get_model_field
+
+try:
+    from django.db.models import FieldDoesNotExist
+except ImportError:
+    from django.core.exceptions import FieldDoesNotExist
+
+# How to read one field, `kind` is one of:
+#   "value": a model field converted by the serializer field, `attname` is read
+#   "pk": the primary key of a foreign key, read from its `attname`
+#   "pk_list": the primary keys of a to-many relation
+#   "nested": a nested serializer of a foreign key or one-to-one
+#   "list": a nested list serializer of a to-many relation
+# and `plan` is the plan of the nested serializer
+Step = namedtuple("Step", ["field_name", "kind", "attname", "plan"])
+
+# Converters that can skip the call to the serializer field
+CONVERTERS = {
+    CharField.to_representation: str,
+    IntegerField.to_representation: int,
+}
+
+
+@lru_cache(maxsize=None)
+def _plain_to_representation_methods():
+    from rest_serializers.mixins import EagerLoadingMixin
+
+    return {
+        serializers.Serializer.to_representation,
+        EagerLoadingMixin.to_representation,
+    }
+
+
+def _get_model_field(model_class, field):
+    if len(field.source_attrs) != 1:
+        return None
+    try:
+        return get_model_field(model_class, field.source)
+    except FieldDoesNotExist:
+        return None
+
+
+def _is_plain(field):
+    # Fields that can be read with a plain getattr, without defaults to apply
+    return (
+        type(field).get_attribute
+        in (Field.get_attribute, relations.RelatedField.get_attribute)
+        and field.default is serializers.empty
+    )
+
+
+def _is_pk(field):
+    return (
+        isinstance(field, relations.PrimaryKeyRelatedField)
+        and field.pk_field is None
+        and type(field).to_representation
+        is relations.PrimaryKeyRelatedField.to_representation
+    )
+
+
+def get_representation_plan(serializer, model_class):
+    """
+    The steps to represent an instance of `model_class` with `serializer`, or
+    `None` when one of its fields, or of its nested serializers, is not a plain
+    model field and needs the full `to_representation`.
+    """
+    if type(serializer).to_representation not in _plain_to_representation_methods():
+        return None
+
+    steps = []
+    for field in serializer._readable_fields:
+        model_field = _get_model_field(model_class, field)
+        if model_field is None:
+            return None
+
+        if isinstance(field, relations.ManyRelatedField):
+            if not (model_field.many_to_many or model_field.one_to_many):
+                return None
+            if not _is_pk(field.child_relation):
+                return None
+            steps.append(Step(field.field_name, "pk_list", field.source, None))
+            continue
+
+        if not _is_plain(field):
+            return None
+
+        if not model_field.is_relation:
+            steps.append(Step(field.field_name, "value", model_field.attname, None))
+            continue
+
+        to_many = model_field.many_to_many or model_field.one_to_many
+        forward = model_field.concrete and not to_many
+
+        if forward and _is_pk(field):
+            steps.append(Step(field.field_name, "pk", model_field.attname, None))
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            if (
+                not to_many
+                or type(field).to_representation
+                is not serializers.ListSerializer.to_representation
+            ):
+                return None
+            plan = get_representation_plan(field.child, model_field.related_model)
+            kind = "list"
+        elif isinstance(field, serializers.ModelSerializer) and forward:
+            plan = get_representation_plan(field, model_field.related_model)
+            kind = "nested"
+        else:
+            return None
+
+        if plan is None:
+            return None
+        steps.append(Step(field.field_name, kind, field.source, plan))
+
+    return tuple(steps)
+
+
+def compile_representation(serializer, plan):
+    """
+    A function that represents an instance as `serializer.to_representation`
+    does, following the plan with the fields of the serializer.
+    """
+    fields = serializer.fields
+    getters = []
+
+    for step in plan:
+        field = fields[step.field_name]
+        get = attrgetter(step.attname)
+
+        if step.kind == "value":
+            convert = CONVERTERS.get(
+                type(field).to_representation, field.to_representation
+            )
+        elif step.kind == "pk":
+            convert = None
+        elif step.kind == "pk_list":
+            get, convert = _compile_pk_list(step.attname), None
+        elif step.kind == "nested":
+            convert = compile_representation(field, step.plan)
+        else:
+            convert = _compile_list(compile_representation(field.child, step.plan))
+
+        getters.append((step.field_name, get, convert))
+
+    def to_representation(instance):
+        ret = {}
+        for field_name, get, convert in getters:
+            value = get(instance)
+            if value is None or convert is None:
+                ret[field_name] = value
+            else:
+                ret[field_name] = convert(value)
+        return ret
+
+    return to_representation
+
+
+def _compile_pk_list(source):
+    def get(instance):
+        # Same as `ManyRelatedField.get_attribute`
+        if instance.pk is None:
+            return []
+        return [item.pk for item in getattr(instance, source).all()]
+
+    return get
+
+
+def _compile_list(child):
+    def convert(manager):
+        return [child(item) for item in manager.all()]
+
+    return convert
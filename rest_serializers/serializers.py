@@ -1,7 +1,23 @@
-from django.db import transaction
-from rest_framework.serializers import ModelSerializer
+from django.db import router, transaction
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import (
+    ListSerializer,
+    ModelSerializer,
+    UniqueTogetherValidator,
+)
 
-from .mixins import EagerLoadingMixin, NestedCreateMixin, NestedUpdateMixin
+from .identity_map import IdentityMap
+from .mixins import (
+    EagerListSerializer,
+    EagerLoadingMixin,
+    NestedCreateMixin,
+    NestedUpdateMixin,
+)
+from .planner import LevelPlanner
+from .settings import get_setting
+from .utils import call_atomic
+from .validators import UniqueTogetherListValidator
 
 
 class EagerModelSerializer(EagerLoadingMixin, ModelSerializer):
@@ -11,10 +27,151 @@ class EagerModelSerializer(EagerLoadingMixin, ModelSerializer):
 class ManyToManySerializer(EagerModelSerializer, NestedCreateMixin, NestedUpdateMixin):
     """Serializer that includes the select, prefetch related and nestable writing"""
 
-    @transaction.atomic
+    def atomic(self):
+        """
+        The transaction of the save. Nested serializers join the one of the
+        outermost serializer without a savepoint, unless `NESTED_SAVEPOINTS`.
+        """
+        nested = "_nested_field" in self.__dict__
+        return transaction.atomic(
+            using=router.db_for_write(self.Meta.model),
+            savepoint=not nested or get_setting("NESTED_SAVEPOINTS"),
+        )
+
     def create(self, validated_data):
-        return super().create(validated_data)
+        with self.atomic():
+            return super().create(validated_data)
 
-    @transaction.atomic
     def update(self, instance, validated_data):
-        return super().update(instance, validated_data)
+        with self.atomic():
+            return super().update(instance, validated_data)
+
+
+class UniqueTogetherListSerializer(ListSerializer):
+    """
+    List serializer that checks the unique together validators of its child for
+    all the items at once, errors are reported per item as usual.
+
+    Use it as the `list_serializer_class` of the child serializer.
+    """
+
+    @cached_property
+    def unique_together_validators(self):
+        return [
+            UniqueTogetherListValidator.from_validator(validator)
+            for validator in self.child.validators
+            if isinstance(validator, UniqueTogetherValidator)
+        ]
+
+    @cached_property
+    def child_validators(self):
+        return [
+            validator
+            for validator in self.child.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+
+    def run_child_validation(self, data):
+        # Leave the unique together out, they are checked for the whole list
+        validators = self.child.validators
+        self.child.validators = self.child_validators
+        try:
+            return super().run_child_validation(data)
+        finally:
+            self.child.validators = validators
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+
+        errors = [{} for _ in value]
+        for validator in self.unique_together_validators:
+            try:
+                validator(value, self)
+            except ValidationError as exc:
+                for item_errors, detail in zip(errors, exc.detail):
+                    for key, messages in detail.items():
+                        item_errors.setdefault(key, []).extend(messages)
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return value
+
+
+class NestedListSerializer(EagerListSerializer):
+    """
+    List serializer that creates and updates many nested roots together: the
+    roots are written with one bulk insert and one bulk update, then every
+    depth below them for all the roots at once, in one transaction.
+
+    Errors of the nested rows are reported per item, as validation errors of
+    the list are. Items with the primary key of one of the instances update
+    it, the others are created.
+
+    Use it as the `list_serializer_class` of a `ManyToManySerializer`.
+    """
+
+    @cached_property
+    def item_instances(self):
+        if self.instance is None:
+            return {}
+        return {str(instance.pk): instance for instance in self.instance}
+
+    def get_item_instance(self, data):
+        if not isinstance(data, dict):
+            return None
+        pk = self.child._get_related_pk(data, self.child.Meta.model)
+        return self.item_instances.get(pk)
+
+    def run_child_validation(self, data):
+        # Validators such as the unique ones exclude the instance of the item
+        self.child.instance = self.get_item_instance(data)
+        try:
+            return super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+
+    def get_item_serializers(self, validated_data):
+        child = self.child
+        direct_instances = child.prefetch_direct_instances(child, self.initial_data)
+
+        serializers = []
+        for data, attrs in zip(self.initial_data, validated_data):
+            serializer = child.__class__(
+                instance=self.get_item_instance(data),
+                data=data,
+                context=self.context,
+                partial=self.partial,
+            )
+            # Already validated by the list
+            serializer._validated_data = attrs
+            serializer._errors = {}
+            serializer._direct_instances = direct_instances
+            serializer._nested_field = child
+            serializers.append(serializer)
+
+        return serializers
+
+    def save_items(self, validated_data):
+        model_class = self.child.Meta.model
+        # One identity map for all the items, as `save` does for one
+        identity_map = self.child.IDENTITY_MAP and "identity_map" not in self.context
+        if identity_map:
+            self.context["identity_map"] = IdentityMap()
+        try:
+            with transaction.atomic(using=router.db_for_write(model_class)):
+                return LevelPlanner(self).save_items(
+                    self.get_item_serializers(validated_data)
+                )
+        finally:
+            if identity_map:
+                del self.context["identity_map"]
+
+    def create(self, validated_data):
+        return self.save_items(validated_data)
+
+    def update(self, instance, validated_data):
+        return self.save_items(validated_data)
+
+    async def asave(self, **kwargs):
+        return await call_atomic(self.child.Meta.model, self.save, **kwargs)
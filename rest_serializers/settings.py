@@ -0,0 +1,23 @@
+from django.conf import settings
+
+# Settings of the package, overridden by the `REST_SERIALIZERS` dict of the
+# project settings
+DEFAULTS = {
+    # Give every nested save its own savepoint, so an error in one row can be
+    # caught and the rows saved before it kept. When false the nested saves
+    # join the transaction of the outermost one: all or nothing
+    "NESTED_SAVEPOINTS": True,
+    # Number of primary keys looked up with one `pk__in` query, kept under the
+    # limit of query parameters of the database
+    "READ_CHUNK_SIZE": 500,
+    # `batch_size` of the bulk inserts and updates, `None` leaves it to Django
+    "WRITE_CHUNK_SIZE": None,
+    # Number of rows deleted with one query, past this number of current rows
+    # the stale ones are found by reading the primary keys of the relation
+    # rather than excluding the current ones in the query
+    "DELETE_CHUNK_SIZE": 500,
+}
+
+
+def get_setting(name):
+    return getattr(settings, "REST_SERIALIZERS", {}).get(name, DEFAULTS[name])
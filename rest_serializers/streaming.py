@@ -0,0 +1,50 @@
+from django.db.models import prefetch_related_objects
+from rest_framework.renderers import JSONRenderer
+
+
+def iter_chunks(queryset, chunk_size):
+    """
+    The instances of the queryset in lists of `chunk_size`, read with
+    `iterator` and with the prefetches of the queryset done one list at a time.
+    """
+    lookups = queryset._prefetch_related_lookups
+    queryset = queryset.prefetch_related(None)
+
+    chunk = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(instance)
+        if len(chunk) == chunk_size:
+            prefetch_related_objects(chunk, *lookups)
+            yield chunk
+            chunk = []
+
+    if chunk:
+        prefetch_related_objects(chunk, *lookups)
+        yield chunk
+
+
+def iter_representation(serializer, queryset, chunk_size):
+    """
+    The representation of each instance of the queryset, only one chunk of
+    instances is held in memory at a time.
+    """
+    for chunk in iter_chunks(queryset, chunk_size):
+        for instance in chunk:
+            yield serializer.to_representation(instance)
+
+
+def iter_json(serializer, queryset, chunk_size, renderer=None):
+    """
+    The queryset rendered as a JSON list, in one bytestring per chunk, for a
+    `StreamingHttpResponse`.
+    """
+    renderer = renderer or JSONRenderer()
+
+    yield b"["
+    separator = b""
+    for chunk in iter_chunks(queryset, chunk_size):
+        data = [serializer.to_representation(instance) for instance in chunk]
+        # Strip the brackets, the items are joined into the one list
+        yield separator + renderer.render(data)[1:-1]
+        separator = b","
+    yield b"]"
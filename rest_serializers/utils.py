@@ -1,7 +1,108 @@
-from django.db import connection, transaction
+from asgiref.sync import sync_to_async
+from django.db import connection, router, transaction
+
+try:
+    from django.db.models import FieldDoesNotExist
+except ImportError:
+    from django.core.exceptions import FieldDoesNotExist
+
+
+def chunked(iterable, size):
+    """
+    The items of the iterable in lists of `size`, or in one list when `size`
+    is `None`.
+    """
+    if size is None:
+        items = list(iterable)
+        if items:
+            yield items
+        return
+
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_missing_pks(queryset, current_ids, chunk_size):
+    """
+    The primary keys of the rows of the queryset that are not in `current_ids`.
+    Past `chunk_size` ids they are not excluded in the query, the primary keys
+    of the queryset are read in chunks and compared instead.
+    """
+    if chunk_size is None or len(current_ids) <= chunk_size:
+        return list(queryset.exclude(pk__in=current_ids).values_list("pk", flat=True))
+
+    current = {str(pk) for pk in current_ids}
+    return [
+        pk
+        for pk in queryset.values_list("pk", flat=True).iterator(chunk_size=chunk_size)
+        if str(pk) not in current
+    ]
 
 
 def set_rollback():
     atomic_requests = connection.settings_dict.get("ATOMIC_REQUESTS", False)
     if atomic_requests and connection.in_atomic_block:
         transaction.set_rollback(True)
+
+
+def _call_atomic(model_class, func, args, kwargs):
+    with transaction.atomic(using=router.db_for_write(model_class)):
+        return func(*args, **kwargs)
+
+
+async def call_atomic(model_class, func, *args, **kwargs):
+    """
+    Await a sync function in a transaction of the database of the model.
+
+    Django can't run a transaction across async code, the function and its
+    transaction run in one thread sensitive call instead, on one connection.
+    """
+    return await sync_to_async(_call_atomic)(model_class, func, args, kwargs)
+
+
+def get_model_field(model_class, attr):
+    try:
+        return model_class._meta.get_field(attr)
+    except FieldDoesNotExist:
+        # Reverse relations without `related_name` are read as `<name>_set`
+        default_postfix = "_set"
+        if attr.endswith(default_postfix):
+            return model_class._meta.get_field(attr[: -len(default_postfix)])
+        raise
+
+
+def is_unchanged(instance, validated_data):
+    """
+    Whether saving `validated_data` on `instance` would write the values it
+    already holds. Anything that is not a concrete field of the model, such as
+    nested data or many-to-manys, counts as a change.
+    """
+    if instance is None or instance.pk is None:
+        return False
+
+    opts = instance._meta
+    for attr, value in validated_data.items():
+        try:
+            field = opts.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        if not field.concrete or field.many_to_many:
+            return False
+
+        if field.is_relation:
+            if value is not None:
+                if not isinstance(value, field.related_model):
+                    return False
+                value = getattr(value, field.target_field.attname)
+            if getattr(instance, field.attname) != value:
+                return False
+        elif getattr(instance, field.attname) != value:
+            return False
+
+    return True
@@ -1,4 +1,129 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Model, Q
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.representation import smart_repr
+
+
+def _get_columns(model_class, fields):
+    # Relations are compared on their raw column so rows don't need fetching
+    return [model_class._meta.get_field(field_name).attname for field_name in fields]
+
+
+def _get_key(values):
+    return tuple(value.pk if isinstance(value, Model) else value for value in values)
+
+
+def _get_lookup(columns, keys):
+    """
+    A filter matching any of the keys, values shared by every key are filtered
+    on once and a single varying column becomes an `IN`.
+    """
+    varying = [
+        index for index in range(len(columns)) if len({key[index] for key in keys}) > 1
+    ]
+    first = keys[0]
+    lookup = Q(
+        **{
+            column: first[index]
+            for index, column in enumerate(columns)
+            if index not in varying
+        }
+    )
+
+    if len(varying) == 1:
+        index = varying[0]
+        return lookup & Q(**{"%s__in" % columns[index]: [key[index] for key in keys]})
+
+    if varying:
+        lookup &= reduce(
+            or_,
+            [Q(**{columns[index]: key[index] for index in varying}) for key in keys],
+        )
+    return lookup
+
+
+def find_not_unique(queryset, fields, rows):
+    """
+    Indexes of the rows that would break a unique together on `fields`.
+
+    `rows` is a list of `(attrs, instance)` where instance is `None` for new
+    rows. The rows are saved one after another, so each row is checked against
+    the values the table holds once the rows before it are saved: a row may
+    take the values an earlier row gave up, but not the values another row
+    still holds. The rows currently holding the values are read with a single
+    query.
+
+    As with `UniqueTogetherValidator` values missing from an update are taken
+    from the instance and rows with a `None` value are not checked. Rows
+    missing a value otherwise are skipped.
+    """
+    columns = _get_columns(queryset.model, fields)
+
+    keys = []
+    to_check = set()
+    for attrs, instance in rows:
+        if instance is not None:
+            values = [
+                attrs[field_name] if field_name in attrs else getattr(instance, column)
+                for field_name, column in zip(fields, columns)
+            ]
+        elif all(field_name in attrs for field_name in fields):
+            values = [attrs[field_name] for field_name in fields]
+        else:
+            keys.append(None)
+            continue
+
+        key = _get_key(values)
+        if None in key:
+            keys.append(None)
+            continue
+        keys.append(key)
+
+        # Rows keeping their values hold them already, they are only taken
+        # from them by an earlier row that is looked up anyway
+        if instance is None or key != _get_key(
+            [getattr(instance, column) for column in columns]
+        ):
+            to_check.add(key)
+
+    # The primary keys holding each value, and the value each one holds
+    holders = defaultdict(set)
+    held = {}
+    if to_check:
+        existing = queryset.filter(_get_lookup(columns, list(to_check)))
+        for row in existing.values_list("pk", *columns):
+            holders[row[1:]].add(row[0])
+            held[row[0]] = row[1:]
+
+    not_unique = []
+    for index, ((_, instance), key) in enumerate(zip(rows, keys)):
+        if key is None:
+            continue
+
+        # New rows hold their values under their index
+        pk = ("new", index) if instance is None else instance.pk
+        if holders[key] - {pk}:
+            not_unique.append(index)
+            continue
+
+        if pk in held:
+            holders[held[pk]].discard(pk)
+        holders[key].add(pk)
+        held[pk] = key
+
+    return not_unique
+
+
+class ParentField(serializers.HiddenField):
+    """
+    The parent a nested row is saved under, added to the nested serializer so
+    its validation sees it. The unique together is then checked for all the
+    rows at once.
+    """
 
 
 class LazyUniqueTogetherValidator(serializers.UniqueTogetherValidator):
@@ -14,8 +139,97 @@ class LazyUniqueTogetherValidator(serializers.UniqueTogetherValidator):
             if field_name not in attrs:
                 return True
 
+    def has_parent_fields(self, serializer):
+        fields = serializer.fields
+        return any(
+            isinstance(fields.get(field_name), ParentField)
+            for field_name in self.fields
+        )
+
     def __call__(self, attrs, serializer):
-        # only allow it to continue if all fields are present
-        if self.has_missing_fields(attrs):
+        # only allow it to continue if all fields are present, rows given
+        # their parent are checked together by `validate_rows`
+        if self.has_missing_fields(attrs) or self.has_parent_fields(serializer):
             return
         super().__call__(attrs, serializer)
+
+    def validate_rows(self, rows):
+        """
+        Validate a list of `(attrs, instance)` at once, once the missing fields
+        are known.
+        """
+        if find_not_unique(self.queryset, self.fields, rows):
+            field_names = ", ".join(self.fields)
+            message = self.message.format(field_names=field_names)
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="unique"
+            )
+
+
+class UniqueTogetherListValidator:
+    """
+    List level counterpart of `UniqueTogetherValidator`.
+
+    Duplicates inside the list are found in memory and the remaining items are
+    checked against the database with a single query, rather than one query per
+    item. Errors are reported per item.
+    """
+
+    message = serializers.UniqueTogetherValidator.message
+    requires_context = True
+
+    def __init__(self, queryset, fields, message=None):
+        self.queryset = queryset
+        self.fields = fields
+        self.message = message or self.message
+
+    @classmethod
+    def from_validator(cls, validator):
+        return cls(validator.queryset, validator.fields, validator.message)
+
+    def get_errors(self, rows):
+        """
+        A list of errors, one per `(attrs, instance)` row, where the attrs are
+        keyed by the validator field names.
+        """
+        errors = [{} for _ in rows]
+        field_names = ", ".join(self.fields)
+        message = self.message.format(field_names=field_names)
+        for index in find_not_unique(self.queryset, self.fields, rows):
+            errors[index] = {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+        return errors
+
+    def __call__(self, value, serializer):
+        child_fields = serializer.child.fields
+        sources = [
+            (
+                child_fields[field_name].source
+                if field_name in child_fields
+                else field_name
+            )
+            for field_name in self.fields
+        ]
+
+        rows = []
+        for attrs in value:
+            rows.append(
+                (
+                    {
+                        field_name: attrs[source]
+                        for field_name, source in zip(self.fields, sources)
+                        if source in attrs
+                    },
+                    None,
+                )
+            )
+
+        errors = self.get_errors(rows)
+        if any(errors):
+            raise serializers.ValidationError(errors, code="unique")
+
+    def __repr__(self):
+        return "<%s(queryset=%s, fields=%s)>" % (
+            self.__class__.__name__,
+            smart_repr(self.queryset),
+            smart_repr(self.fields),
+        )
@@ -0,0 +1,150 @@
+from collections import defaultdict
+
+from django.db.models.query_utils import DeferredAttribute
+
+from rest_serializers.representation import CONVERTERS
+from rest_serializers.utils import get_model_field
+
+
+def _get_ordering(model_class, prefix):
+    # The default ordering of a related manager, for the joined query
+    ordering = []
+    for field_name in model_class._meta.ordering:
+        if not isinstance(field_name, str) or field_name == "?":
+            continue
+        if field_name.startswith("-"):
+            ordering.append("-%s%s" % (prefix, field_name[1:]))
+        else:
+            ordering.append(prefix + field_name)
+    ordering.append(prefix + "pk")
+    return ordering
+
+
+def can_read_values(plan, model_class):
+    """
+    Whether the plan can be read from `values_list` rows. A value is read from
+    its column rather than from the attribute of an instance, so fields whose
+    attribute is wrapped by a descriptor, such as files, need instances.
+    """
+    for step in plan:
+        if step.kind == "value":
+            descriptor = getattr(model_class, step.attname, None)
+            if type(descriptor) is not DeferredAttribute:
+                return False
+        elif step.kind in ("nested", "list"):
+            related_model = get_model_field(model_class, step.attname).related_model
+            if not can_read_values(step.plan, related_model):
+                return False
+    return True
+
+
+class ValuesReader:
+    """
+    Represents the instances of a queryset from `values_list` rows, following
+    the representation plan of a serializer, without building model instances.
+
+    The fields of the foreign keys and one-to-ones nested in the serializer are
+    read with joins in the same query. Each nested list, or list of primary
+    keys, is read with one more query joined from the model that holds it.
+    """
+
+    def __init__(self, serializer, plan, model_class):
+        fields = serializer.fields
+        self.model_class = model_class
+        self.columns = ["pk"]
+        # (field_name, kind, convert, reader, lookup)
+        self.steps = []
+
+        for step in plan:
+            field = fields[step.field_name]
+            reader = convert = lookup = None
+
+            if step.kind == "value":
+                convert = CONVERTERS.get(
+                    type(field).to_representation, field.to_representation
+                )
+                self.columns.append(step.attname)
+            elif step.kind == "pk":
+                self.columns.append(step.attname)
+            else:
+                model_field = get_model_field(model_class, step.attname)
+                related_model = model_field.related_model
+                lookup = model_field.name
+
+                if step.kind == "nested":
+                    reader = ValuesReader(field, step.plan, related_model)
+                    self.columns.extend(
+                        "%s__%s" % (lookup, column) for column in reader.columns
+                    )
+                elif step.kind == "list":
+                    reader = ValuesReader(field.child, step.plan, related_model)
+
+            self.steps.append((step.field_name, step.kind, convert, reader, lookup))
+
+    def build(self, row, start, lists):
+        """
+        The representation read from `row` at `start`, with the position of the
+        next column. Nested lists are added to `lists` to be read afterwards.
+        """
+        pk = row[start]
+        if pk is None:
+            # Nothing to represent when a foreign key is null
+            return None, start + len(self.columns)
+
+        ret = {}
+        index = start + 1
+        for field_name, kind, convert, reader, lookup in self.steps:
+            if kind == "nested":
+                ret[field_name], index = reader.build(row, index, lists)
+            elif kind in ("list", "pk_list"):
+                ret[field_name] = []
+                lists[(self, lookup, reader)].append((pk, ret[field_name]))
+            else:
+                value = row[index]
+                index += 1
+                if value is not None and convert is not None:
+                    value = convert(value)
+                ret[field_name] = value
+
+        return ret, index
+
+    def read(self, queryset):
+        lists = defaultdict(list)
+        rows = queryset.prefetch_related(None).values_list(*self.columns)
+        data = [self.build(row, 0, lists)[0] for row in rows]
+
+        # One query per nested list and depth
+        while lists:
+            pending = lists
+            lists = defaultdict(list)
+            for (owner, lookup, reader), targets in pending.items():
+                owner.read_list(lookup, reader, targets, lists)
+
+        return data
+
+    def read_list(self, lookup, reader, targets, lists):
+        related_model = self.model_class._meta.get_field(lookup).related_model
+        ordering = _get_ordering(related_model, lookup + "__")
+        if reader is None:
+            # A list of primary keys
+            columns = ["%s__pk" % lookup]
+        else:
+            columns = ["%s__%s" % (lookup, column) for column in reader.columns]
+
+        rows = (
+            self.model_class._default_manager.filter(pk__in={pk for pk, _ in targets})
+            .order_by(*ordering)
+            .values_list("pk", *columns)
+        )
+
+        items = defaultdict(list)
+        for row in rows:
+            if row[1] is None:
+                continue
+            if reader is None:
+                items[row[0]].append(row[1])
+            else:
+                items[row[0]].append(reader.build(row, 1, lists)[0])
+
+        for pk, target in targets:
+            target.extend(items[pk])
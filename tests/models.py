@@ -1,3 +1,5 @@
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
 
@@ -35,6 +37,62 @@ class Toy(models.Model):
 class House(models.Model):
     name = models.CharField(max_length=20)
     parents = models.ManyToManyField(Parent, blank=True)
+    tags = GenericRelation("Tag")
+
+    class Meta:
+        app_label = "tests"
+        ordering = ("name",)
+
+
+# Models for direct relations nested in reverse relations
+class Room(models.Model):
+    name = models.CharField(max_length=20)
+    house = models.ForeignKey(House, related_name="rooms", on_delete=models.CASCADE)
+    owner = models.ForeignKey(
+        Parent,
+        related_name="rooms",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    class Meta:
+        app_label = "tests"
+        ordering = ("name",)
+
+
+# Models for generic relations
+class Tag(models.Model):
+    name = models.CharField(max_length=20)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey()
+
+    class Meta:
+        app_label = "tests"
+        ordering = ("name",)
+
+
+# Models for fields wrapped by a descriptor
+class Document(models.Model):
+    house = models.ForeignKey(House, related_name="documents", on_delete=models.CASCADE)
+    file = models.FileField(upload_to="documents/")
+
+    class Meta:
+        app_label = "tests"
+        ordering = ("pk",)
+
+
+# Models for trees of any depth
+class Node(models.Model):
+    name = models.CharField(max_length=20)
+    parent = models.ForeignKey(
+        "self",
+        related_name="nodes",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+    )
 
     class Meta:
         app_label = "tests"
@@ -0,0 +1,104 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.mixins import EagerListSerializer
+from rest_serializers.serializers import (
+    ManyToManySerializer,
+    UniqueTogetherListSerializer,
+)
+from tests.models import Child, Parent
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Child
+        fields = ("id", "name")
+
+
+class ParentSerializer(ManyToManySerializer):
+    PREFETCH_RELATED_FIELDS = ["children"]
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class ListParentSerializer(ManyToManySerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+        list_serializer_class = UniqueTogetherListSerializer
+
+
+class AsyncTests(TestCase):
+    async def test_asave__create(self):
+        data = {"name": "Mr Smith", "children": [{"name": "Dave"}, {"name": "Tim"}]}
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(await serializer.ais_valid())
+
+        parent = await serializer.asave()
+
+        self.assertEqual(await Child.objects.filter(parent=parent).acount(), 2)
+
+    async def test_asave__update(self):
+        parent = await Parent.objects.acreate(name="Mr Smith")
+        child = await Child.objects.acreate(parent=parent, name="Dave")
+        await Child.objects.acreate(parent=parent, name="Tim")
+
+        data = {
+            "id": parent.pk,
+            "name": "Mr Jones",
+            "children": [{"id": child.pk, "name": "David"}],
+        }
+        serializer = ParentSerializer(parent, data=data)
+        self.assertTrue(await serializer.ais_valid())
+        await serializer.asave()
+
+        names = [c.name async for c in Child.objects.filter(parent=parent)]
+        self.assertEqual(names, ["David"])
+
+    async def test_asave__rolls_back(self):
+        await Parent.objects.acreate(name="Mr Smith")
+        data = {"name": "Mr Jones", "children": [{"name": "Dave"}]}
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(await serializer.ais_valid())
+
+        # fail after the parent is written
+        with self.assertRaises(TypeError):
+            await serializer.asave(children=None)
+
+        self.assertFalse(await Parent.objects.filter(name="Mr Jones").aexists())
+
+    async def test_acreate_and_aupdate(self):
+        serializer = ParentSerializer(data={"name": "Mr Smith", "children": []})
+        self.assertTrue(await serializer.ais_valid())
+
+        parent = await serializer.acreate({"name": "Mr Smith"})
+        parent = await serializer.aupdate(parent, {"name": "Mr Jones"})
+
+        self.assertEqual((await Parent.objects.aget(pk=parent.pk)).name, "Mr Jones")
+
+    async def test_adata(self):
+        parent = await Parent.objects.acreate(name="Mr Smith")
+        await Child.objects.acreate(parent=parent, name="Dave")
+        queryset = ParentSerializer.setup_eager_loading(Parent.objects.all())
+
+        data = await ParentSerializer(queryset, many=True).adata()
+
+        self.assertEqual(data[0]["children"][0]["name"], "Dave")
+        self.assertEqual(
+            data,
+            await sync_to_async(lambda: ParentSerializer(queryset, many=True).data)(),
+        )
+
+    def test_list_serializer_class(self):
+        self.assertIs(type(ParentSerializer(many=True)), EagerListSerializer)
+        # without writing it onto the Meta of the serializer
+        self.assertFalse(hasattr(ParentSerializer.Meta, "list_serializer_class"))
+        # A list class named by the Meta is kept
+        self.assertIs(
+            type(ListParentSerializer(many=True)), UniqueTogetherListSerializer
+        )
@@ -0,0 +1,171 @@
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import Child, House, Parent
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Child
+        fields = ("id", "name")
+
+
+class ParentSerializer(ManyToManySerializer):
+    BULK_REVERSE_RELATIONS = True
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class SaveChildSerializer(ChildSerializer):
+    def save(self, **kwargs):
+        return super().save(name="FROM_SAVE", **kwargs)
+
+
+class NestedSaveChildSerializer(ManyToManySerializer):
+    def save(self, **kwargs):
+        return super().save(name="FROM_SAVE", **kwargs)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name")
+
+
+class SaveParentSerializer(ManyToManySerializer):
+    BULK_REVERSE_RELATIONS = True
+
+    children = SaveChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class NestedSaveParentSerializer(SaveParentSerializer):
+    children = NestedSaveChildSerializer(many=True)
+
+
+class HouseParentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+
+
+class HouseSerializer(ManyToManySerializer):
+    BULK_REVERSE_RELATIONS = True
+
+    parents = HouseParentSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "parents")
+
+
+class BulkReverseRelationsTests(TestCase):
+    def _create_test_data(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.child_1 = Child.objects.create(parent=self.parent, name="Dave Smith")
+        self.child_2 = Child.objects.create(parent=self.parent, name="Tim Smith")
+
+    def test_add__with_related_entities(self):
+        data = {
+            "name": "Fred Smith",
+            "children": [{"name": "Bobby"}, {"name": "Steve"}],
+        }
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        parent = Parent.objects.get(name="Fred Smith")
+        bobby = Child.objects.get(parent=parent, name="Bobby")
+        steve = Child.objects.get(parent=parent, name="Steve")
+
+        # primary keys are written back to the data
+        self.assertEqual(
+            [d["pk"] for d in serializer.initial_data["children"]],
+            [bobby.pk, steve.pk],
+        )
+
+    def test_add__writes_all_rows_in_one_insert(self):
+        data = {
+            "name": "Fred Smith",
+            "children": [{"name": "Child %s" % i} for i in range(50)],
+        }
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        # savepoint, parent insert, children insert, release
+        with self.assertNumQueries(4):
+            serializer.save()
+
+        self.assertEqual(Child.objects.count(), 50)
+
+    def test_update__related_entities(self):
+        self._create_test_data()
+        data = {
+            "id": self.parent.pk,
+            "name": "Freddy Star",
+            "children": [
+                {"id": self.child_1.id, "name": "Bob"},
+                {"name": "Fred"},
+            ],
+        }
+        serializer = ParentSerializer(self.parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(Child.objects.count(), 2)
+        Parent.objects.get(id=self.parent.id, name="Freddy Star")
+        Child.objects.get(id=self.child_1.id, name="Bob")
+        Child.objects.get(parent=self.parent, name="Fred")
+
+    def test_update__writes_rows_in_bulk(self):
+        parent = Parent.objects.create(name="Mr Smith")
+        children = [
+            Child.objects.create(parent=parent, name="Child %s" % i) for i in range(20)
+        ]
+        data = {
+            "id": parent.pk,
+            "name": "Mr Smith",
+            "children": [{"id": c.pk, "name": c.name + "!"} for c in children]
+            + [{"name": "New"}],
+        }
+        serializer = ParentSerializer(parent, data=data)
+        self.assertTrue(serializer.is_valid())
+
+        # savepoint, parent update, children select, insert, update,
+        # stale children select, release
+        with self.assertNumQueries(7):
+            serializer.save()
+
+        self.assertEqual(Child.objects.filter(name__endswith="!").count(), 20)
+        Child.objects.get(parent=parent, name="New")
+
+    def test_overridden_save_is_called(self):
+        for serializer_class in (SaveParentSerializer, NestedSaveParentSerializer):
+            data = {"name": "Mr Smith", "children": [{"name": "x"}]}
+            serializer = serializer_class(data=data)
+            self.assertTrue(serializer.is_valid())
+            parent = serializer.save()
+
+            self.assertEqual(
+                list(parent.children.values_list("name", flat=True)), ["FROM_SAVE"]
+            )
+
+    def test_many_to_many(self):
+        parent = Parent.objects.create(name="Dave Smith")
+        data = {
+            "name": "94b",
+            "parents": [{"id": parent.pk, "name": "Dave"}, {"name": "Tim"}],
+        }
+        serializer = HouseSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        house = serializer.save()
+
+        self.assertEqual(
+            list(house.parents.values_list("name", flat=True)), ["Dave", "Tim"]
+        )
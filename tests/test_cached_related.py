@@ -0,0 +1,121 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.mixins.base import get_nested_lookups
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class CachedRelatedTests(TestCase):
+    def setUp(self):
+        parent = Parent.objects.create(name="Mr Smith")
+        for i in range(3):
+            child = Child.objects.create(parent=parent, name="Child %s" % i)
+            for j in range(2):
+                Toy.objects.create(child=child, name="Toy %s%s" % (i, j))
+
+    def _get_data(self, parent):
+        return {
+            "name": parent.name,
+            "children": [
+                {
+                    "pk": child.pk,
+                    "name": child.name,
+                    "toys": [
+                        {"pk": toy.pk, "name": toy.name} for toy in child.toys.all()
+                    ],
+                }
+                for child in parent.children.all()
+            ],
+        }
+
+    def _save(self, serializer_class, parent, data):
+        serializer = serializer_class(parent, data=data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+        # The reads of the existing rows, not those of the stale ones
+        selects = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("SELECT")
+            and "IN (" in query["sql"]
+            and "NOT" not in query["sql"]
+        ]
+        return serializer, selects
+
+    def test_get_nested_lookups(self):
+        data = self._get_data(Parent.objects.get())
+        self.assertEqual(
+            get_nested_lookups(ParentSerializer(), [data]),
+            ["children", "children__toys"],
+        )
+        self.assertEqual(
+            get_nested_lookups(ChildSerializer(), data["children"]), ["toys"]
+        )
+        self.assertEqual(get_nested_lookups(ToySerializer(), [{"name": "Toy"}]), [])
+
+    def test_uses_prefetched_instances(self):
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            data = self._get_data(Parent.objects.get())
+            parent = Parent.objects.prefetch_related("children__toys").get()
+
+            _, selects = self._save(serializer_class, parent, data)
+
+            self.assertEqual(selects, [])
+
+    def test_prefetches_next_depth(self):
+        data = self._get_data(Parent.objects.get())
+        parent = Parent.objects.get()
+
+        _, selects = self._save(ParentSerializer, parent, data)
+
+        # The children, and the toys of all of them with the same queryset
+        self.assertEqual(len(selects), 2)
+        self.assertIn('"tests_child"', selects[0])
+        self.assertIn('"tests_toy"', selects[1])
+
+    def test_new_rows_and_cleared_cache(self):
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            parent = Parent.objects.prefetch_related("children__toys").get()
+            data = self._get_data(parent)
+            data["children"][0]["toys"] = [{"name": "New toy"}]
+            data["children"].append({"name": "New child", "toys": []})
+
+            serializer, _ = self._save(serializer_class, parent, data)
+
+            children = serializer.data["children"]
+            self.assertEqual(len(children), 4)
+            self.assertEqual(
+                [toy["name"] for toy in children[0]["toys"]],
+                ["New toy"],
+            )
+            Child.objects.filter(name="New child").delete()
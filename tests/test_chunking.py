@@ -0,0 +1,98 @@
+import re
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from rest_serializers.utils import chunked
+from tests.models import Child, Parent
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Child
+        fields = ("id", "name")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+@override_settings(
+    REST_SERIALIZERS={
+        "READ_CHUNK_SIZE": 2,
+        "WRITE_CHUNK_SIZE": 2,
+        "DELETE_CHUNK_SIZE": 2,
+    }
+)
+class ChunkingTests(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.children = [
+            Child.objects.create(parent=self.parent, name="Child %s" % i)
+            for i in range(8)
+        ]
+
+    def _save(self, serializer_class, children):
+        data = {"name": "Mr Smith", "children": children}
+        serializer = serializer_class(self.parent, data=data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+        return [
+            query["sql"]
+            for query in ctx.captured_queries
+            if '"tests_child"' in query["sql"]
+        ]
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked(range(5), None)), [[0, 1, 2, 3, 4]])
+        self.assertEqual(list(chunked([], None)), [])
+
+    def _test_update(self, serializer_class):
+        # Keep five children, delete three and add three
+        children = [
+            {"pk": child.pk, "name": child.name + "!"} for child in self.children[:5]
+        ]
+        children.extend({"name": "New %s" % i} for i in range(3))
+        queries = self._save(serializer_class, children)
+
+        self.assertEqual(
+            sorted(self.parent.children.values_list("name", flat=True)),
+            ["Child %s!" % i for i in range(5)] + ["New %s" % i for i in range(3)],
+        )
+        self.assertFalse(
+            Child.objects.filter(
+                pk__in=[child.pk for child in self.children[5:]]
+            ).exists()
+        )
+
+        # No query looks up more than two rows at a time
+        for values in re.findall(r" IN \(([^)]*)\)", "\n".join(queries)):
+            self.assertLessEqual(len(values.split(",")), 2)
+        # The three stale ones are deleted two at a time
+        deletes = [sql for sql in queries if sql.startswith("DELETE")]
+        self.assertEqual(len(deletes), 2)
+
+        return queries
+
+    def test_update(self):
+        self._test_update(ParentSerializer)
+
+    def test_update__bulk(self):
+        queries = self._test_update(BulkParentSerializer)
+
+        inserts = [sql for sql in queries if sql.startswith("INSERT")]
+        updates = [sql for sql in queries if sql.startswith("UPDATE")]
+        self.assertEqual((len(inserts), len(updates)), (2, 3))
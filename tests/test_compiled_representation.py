@@ -0,0 +1,122 @@
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import EagerModelSerializer
+from tests.models import Child, House, Parent, Room, Toy
+
+
+class UpperCaseField(serializers.CharField):
+    def to_representation(self, value):
+        return value.upper()
+
+
+class ToySerializer(serializers.ModelSerializer):
+    name = UpperCaseField()
+
+    class Meta:
+        model = Toy
+        fields = ("id", "name", "child")
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "parent", "toys")
+
+
+class ParentSerializer(EagerModelSerializer):
+    PREFETCH_RELATED_FIELDS = ["children__toys", "house_set"]
+
+    children = ChildSerializer(many=True)
+    house_set = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children", "house_set")
+
+
+class CompiledParentSerializer(ParentSerializer):
+    COMPILED_REPRESENTATION = True
+
+
+class RoomSerializer(EagerModelSerializer):
+    owner = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "owner")
+
+    def get_owner(self, room):
+        return room.owner.name if room.owner else None
+
+
+class CompiledRoomSerializer(RoomSerializer):
+    COMPILED_REPRESENTATION = True
+
+
+class NestedRoomSerializer(EagerModelSerializer):
+    COMPILED_REPRESENTATION = True
+    SELECT_RELATED_FIELDS = ["owner"]
+
+    owner = ParentSerializer()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "owner", "house")
+
+
+class CompiledRepresentationTests(TestCase):
+    def setUp(self):
+        self.house = House.objects.create(name="94b")
+        for i in range(3):
+            parent = Parent.objects.create(name="Parent %s" % i)
+            self.house.parents.add(parent)
+            Room.objects.create(
+                house=self.house, owner=parent if i else None, name="Room %s" % i
+            )
+            for j in range(2):
+                child = Child.objects.create(parent=parent, name="Child %s" % j)
+                Toy.objects.create(child=child, name="Toy %s" % j)
+
+    def _get_data(self, serializer_class, model_class):
+        queryset = serializer_class.setup_eager_loading(model_class.objects.all())
+        return serializer_class(queryset, many=True).data
+
+    def test_same_representation(self):
+        expected = self._get_data(ParentSerializer, Parent)
+
+        with self.assertNumQueries(4):
+            data = self._get_data(CompiledParentSerializer, Parent)
+
+        self.assertEqual(data, expected)
+        self.assertEqual(data[0]["children"][0]["toys"][0]["name"], "TOY 0")
+        self.assertIsNotNone(CompiledParentSerializer().get_representation_plan())
+
+    def test_nested_serializer(self):
+        data = self._get_data(NestedRoomSerializer, Room)
+
+        self.assertIsNone(data[0]["owner"])
+        self.assertEqual(
+            data[1]["owner"], ParentSerializer(Parent.objects.get(name="Parent 1")).data
+        )
+        self.assertEqual(data[1]["house"], self.house.pk)
+        self.assertIsNotNone(NestedRoomSerializer().get_representation_plan())
+
+    def test_falls_back_for_custom_fields(self):
+        self.assertIsNone(CompiledRoomSerializer().get_representation_plan())
+        self.assertEqual(
+            self._get_data(CompiledRoomSerializer, Room),
+            self._get_data(RoomSerializer, Room),
+        )
+
+    def test_plan_is_cached_per_class(self):
+        plans = CompiledParentSerializer.__dict__.get("_representation_plans", {})
+        plans.clear()
+
+        CompiledParentSerializer().get_representation_plan()
+        CompiledParentSerializer().get_representation_plan()
+
+        self.assertEqual(len(CompiledParentSerializer._representation_plans), 1)
+        self.assertNotIn("_representation_plans", ParentSerializer.__dict__)
@@ -0,0 +1,81 @@
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import House, Parent, Room
+
+
+class OwnerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+
+
+class RoomSerializer(ManyToManySerializer):
+    owner = OwnerSerializer()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "owner")
+
+
+class HouseSerializer(ManyToManySerializer):
+    rooms = RoomSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "rooms")
+
+
+class BulkHouseSerializer(HouseSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class DirectRelationsTests(TestCase):
+    def setUp(self):
+        self.owners = [Parent.objects.create(name="Owner %s" % i) for i in range(10)]
+
+    def _get_data(self):
+        return {
+            "name": "94b",
+            "rooms": [
+                {"name": "Room %s" % i, "owner": {"id": owner.pk, "name": owner.name}}
+                for i, owner in enumerate(self.owners)
+            ],
+        }
+
+    def test_owners_are_fetched_once(self):
+        serializer = HouseSerializer(data=self._get_data())
+        self.assertTrue(serializer.is_valid())
+
+        # savepoint, house insert, owners select, release and for each room a
+        # savepoint, owner update, room insert and release
+        with self.assertNumQueries(44):
+            house = serializer.save()
+
+        self.assertEqual(
+            [room.owner for room in house.rooms.order_by("pk")], self.owners
+        )
+
+    def test_owners_are_fetched_once__bulk(self):
+        serializer = BulkHouseSerializer(data=self._get_data())
+        self.assertTrue(serializer.is_valid())
+
+        # savepoint, house insert, owners select, an update per owner, rooms
+        # insert, release
+        with self.assertNumQueries(15):
+            house = serializer.save()
+
+        self.assertEqual(
+            [room.owner for room in house.rooms.order_by("pk")], self.owners
+        )
+
+    def test_new_owner(self):
+        data = self._get_data()
+        data["rooms"].append({"name": "Attic", "owner": {"name": "Lodger"}})
+        serializer = HouseSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        house = serializer.save()
+
+        self.assertEqual(house.rooms.get(name="Attic").owner.name, "Lodger")
+        self.assertEqual(Parent.objects.count(), 11)
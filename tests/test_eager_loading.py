@@ -0,0 +1,108 @@
+from django.db.models import Prefetch
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import EagerModelSerializer
+from tests.models import Child, House, Parent, Room, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    toys = ToySerializer(many=True)
+    parent_name = serializers.CharField(source="parent.name")
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "parent", "parent_name", "toys")
+
+
+class ParentSerializer(EagerModelSerializer):
+    AUTO_EAGER_LOADING = True
+
+    children = ChildSerializer(many=True)
+    house_set = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children", "house_set")
+
+
+class OwnerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+
+
+class RoomSerializer(EagerModelSerializer):
+    AUTO_EAGER_LOADING = True
+
+    owner = OwnerSerializer()
+    house = serializers.StringRelatedField()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "owner", "house")
+
+
+class ManualRoomSerializer(RoomSerializer):
+    SELECT_RELATED_FIELDS = ["owner"]
+
+
+class EagerLoadingTests(TestCase):
+    def setUp(self):
+        house = House.objects.create(name="94b")
+        for i in range(3):
+            parent = Parent.objects.create(name="Parent %s" % i)
+            house.parents.add(parent)
+            Room.objects.create(house=house, owner=parent, name="Room %s" % i)
+            for j in range(3):
+                child = Child.objects.create(parent=parent, name="Child %s" % j)
+                Toy.objects.create(child=child, name="Toy %s" % j)
+
+    def test_get_eager_loading(self):
+        select_related, prefetch_related = ParentSerializer.get_eager_loading()
+
+        self.assertEqual(select_related, [])
+        self.assertEqual(len(prefetch_related), 2)
+        children, house_set = prefetch_related
+        self.assertIsInstance(children, Prefetch)
+        self.assertEqual(children.prefetch_to, "children")
+        self.assertEqual(children.queryset.query.select_related, {"parent": {}})
+        self.assertEqual(children.queryset._prefetch_related_lookups, ("toys",))
+        self.assertEqual(house_set, "house_set")
+
+        self.assertEqual(RoomSerializer.get_eager_loading(), (["owner", "house"], []))
+
+    def test_get_eager_loading__is_cached_per_class(self):
+        self.assertIs(
+            RoomSerializer.get_eager_loading(), RoomSerializer.get_eager_loading()
+        )
+        self.assertIsNot(
+            ManualRoomSerializer.get_eager_loading(),
+            RoomSerializer.get_eager_loading(),
+        )
+
+    def test_nested_lists_are_prefetched(self):
+        queryset = ParentSerializer.setup_eager_loading(Parent.objects.all())
+
+        # parents, children with their parent, toys and houses
+        with self.assertNumQueries(4):
+            data = ParentSerializer(queryset, many=True).data
+
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]["children"][0]["parent_name"], "Parent 0")
+        self.assertEqual(data[0]["children"][0]["toys"][0]["name"], "Toy 0")
+
+    def test_nested_instances_are_selected(self):
+        queryset = ManualRoomSerializer.setup_eager_loading(Room.objects.all())
+
+        with self.assertNumQueries(1):
+            data = ManualRoomSerializer(queryset, many=True).data
+
+        self.assertEqual(data[0]["owner"]["name"], "Parent 0")
+        self.assertEqual(data[0]["house"], str(House.objects.get()))
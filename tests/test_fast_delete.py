@@ -0,0 +1,102 @@
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class FastDeleteTests(TestCase):
+    def _create_test_data(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.child = Child.objects.create(parent=self.parent, name="Dave Smith")
+        self.toys = [
+            Toy.objects.create(child=self.child, name="Toy %s" % i) for i in range(10)
+        ]
+
+    def test_update__removes_stale_rows_in_one_query(self):
+        self._create_test_data()
+        data = {
+            "id": self.child.pk,
+            "name": "Dave Smith",
+            "toys": [{"id": self.toys[0].pk, "name": "Ball"}],
+        }
+        serializer = ChildSerializer(self.child, data=data)
+        self.assertTrue(serializer.is_valid())
+
+        # savepoint, child update, toys select, toy update, delete, release
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+
+        self.assertEqual(len(ctx.captured_queries), 6)
+        # Nothing depends on toys, the stale ones are deleted without a select
+        delete = ctx.captured_queries[4]["sql"]
+        self.assertTrue(delete.startswith('DELETE FROM "tests_toy"'), delete)
+
+        self.assertEqual(list(Toy.objects.values_list("name", flat=True)), ["Ball"])
+
+    def test_update__signals_are_still_sent(self):
+        self._create_test_data()
+        deleted = []
+
+        def receiver(instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Toy)
+        try:
+            data = {"id": self.child.pk, "name": "Dave Smith", "toys": []}
+            serializer = ChildSerializer(self.child, data=data)
+            self.assertTrue(serializer.is_valid())
+            serializer.save()
+        finally:
+            post_delete.disconnect(receiver, sender=Toy)
+
+        self.assertEqual(sorted(deleted), sorted(toy.pk for toy in self.toys))
+        self.assertEqual(Toy.objects.count(), 0)
+
+    def test_update__cascades_are_collected(self):
+        self._create_test_data()
+        other = Child.objects.create(parent=self.parent, name="Tim Smith")
+        Toy.objects.create(child=other, name="Drum")
+
+        data = {
+            "id": self.parent.pk,
+            "name": "Mr Smith",
+            "children": [
+                {
+                    "id": self.child.pk,
+                    "name": "Dave Smith",
+                    "toys": [{"id": self.toys[0].pk, "name": "Ball"}],
+                }
+            ],
+        }
+        serializer = ParentSerializer(self.parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(list(Child.objects.all()), [self.child])
+        self.assertEqual(list(Toy.objects.values_list("name", flat=True)), ["Ball"])
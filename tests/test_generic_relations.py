@@ -0,0 +1,104 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import House, Tag
+
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ("id", "name")
+
+
+class HouseSerializer(ManyToManySerializer):
+    tags = TagSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "tags")
+
+
+class BulkHouseSerializer(HouseSerializer):
+    BULK_GENERIC_RELATIONS = True
+
+
+class GenericRelationTests(TestCase):
+    def setUp(self):
+        self.house = House.objects.create(name="94b")
+        self.tags = [
+            Tag.objects.create(content_object=self.house, name="Tag %s" % i)
+            for i in range(3)
+        ]
+
+    def _save(self, serializer_class, tags, instance=None):
+        data = {"name": "94b", "tags": tags}
+        serializer = serializer_class(instance, data=data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as ctx:
+            house = serializer.save()
+        return house, [query["sql"] for query in ctx.captured_queries]
+
+    def test_create(self):
+        for serializer_class in (HouseSerializer, BulkHouseSerializer):
+            tags = [{"name": "New %s" % i} for i in range(3)]
+            house, _ = self._save(serializer_class, tags)
+
+            self.assertEqual(
+                [tag.name for tag in house.tags.all()], ["New 0", "New 1", "New 2"]
+            )
+
+    def test_update(self):
+        for serializer_class in (HouseSerializer, BulkHouseSerializer):
+            tags = [{"pk": self.tags[1].pk, "name": "Renamed"}, {"name": "New"}]
+            self._save(serializer_class, tags, self.house)
+
+            self.assertEqual(
+                [tag.name for tag in self.house.tags.all()], ["New", "Renamed"]
+            )
+            self.assertFalse(Tag.objects.filter(pk=self.tags[0].pk).exists())
+
+            self.tags = list(self.house.tags.all())
+
+    def test_bulk_queries(self):
+        tags = [{"pk": tag.pk, "name": tag.name + "!"} for tag in self.tags[1:]]
+        tags.extend({"name": "New %s" % i} for i in range(3))
+        _, queries = self._save(BulkHouseSerializer, tags, self.house)
+
+        tag_queries = [sql.split(" ")[0] for sql in queries if '"tests_tag"' in sql]
+        # Existing tags, one update, one insert and one delete
+        self.assertEqual(tag_queries, ["SELECT", "UPDATE", "INSERT", "DELETE"])
+        self.assertEqual(self.house.tags.count(), 5)
+
+    def test_content_type_is_looked_up_once(self):
+        ContentType.objects.clear_cache()
+        tags = [{"name": "Tag %s" % i} for i in range(3)]
+        _, queries = self._save(HouseSerializer, tags, self.house)
+
+        # Read once and then from the cache of the database
+        self.assertEqual(
+            len([sql for sql in queries if "django_content_type" in sql]), 1
+        )
+        _, queries = self._save(HouseSerializer, tags, self.house)
+        self.assertFalse([sql for sql in queries if "django_content_type" in sql])
+
+    def test_content_type_follows_the_cache_of_django(self):
+        content_type = HouseSerializer.get_content_type(House, using="default")
+        self.assertEqual(content_type, ContentType.objects.get_for_model(House))
+
+        # A cleared cache, as after flushing the database, is read again
+        ContentType.objects.clear_cache()
+        with self.assertNumQueries(1):
+            HouseSerializer.get_content_type(House)
+
+    def test_uses_prefetched_tags(self):
+        house = House.objects.prefetch_related("tags").get()
+        tags = [{"pk": tag.pk, "name": tag.name} for tag in self.tags]
+        _, queries = self._save(HouseSerializer, tags, house)
+
+        self.assertFalse(
+            [sql for sql in queries if sql.startswith('SELECT "tests_tag"."id", ')]
+        )
@@ -0,0 +1,105 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.identity_map import IdentityMap
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import House, Parent, Room
+
+
+class ParentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+
+
+class RoomSerializer(ManyToManySerializer):
+    owner = ParentSerializer()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "owner")
+
+
+class HouseSerializer(ManyToManySerializer):
+    IDENTITY_MAP = True
+
+    parents = ParentSerializer(many=True)
+    rooms = RoomSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "parents", "rooms")
+
+
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        self.house = House.objects.create(name="94b")
+        self.parents = [Parent.objects.create(name="Parent %s" % i) for i in range(2)]
+        self.house.parents.add(*self.parents)
+        for i, parent in enumerate(self.parents):
+            Room.objects.create(house=self.house, owner=parent, name="Room %s" % i)
+
+    def _get_data(self):
+        parents = [{"pk": parent.pk, "name": parent.name} for parent in self.parents]
+        return {
+            "name": "94b",
+            "parents": parents,
+            "rooms": [
+                {"pk": room.pk, "name": room.name, "owner": parents[i]}
+                for i, room in enumerate(self.house.rooms.all())
+            ],
+        }
+
+    def _count_parent_reads(self, serializer):
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+        return sum(
+            query["sql"].startswith('SELECT "tests_parent"."id", "tests_parent"."name"')
+            for query in ctx.captured_queries
+        )
+
+    def test_fetch(self):
+        identity_map = IdentityMap()
+        with self.assertNumQueries(1):
+            first = identity_map.fetch(Parent, [self.parents[0].pk])
+        with self.assertNumQueries(1):
+            both = identity_map.fetch(Parent, [p.pk for p in self.parents])
+        with self.assertNumQueries(0):
+            again = identity_map.fetch(Parent, [self.parents[1].pk])
+
+        pk = str(self.parents[0].pk)
+        self.assertIs(both[pk], first[pk])
+        self.assertEqual(identity_map.get(Parent, self.parents[1].pk), self.parents[1])
+        self.assertIs(again[str(self.parents[1].pk)], both[str(self.parents[1].pk)])
+
+    def test_rows_are_read_once_per_save(self):
+        serializer = HouseSerializer(self.house, data=self._get_data())
+        serializer.is_valid(raise_exception=True)
+
+        self.assertEqual(self._count_parent_reads(serializer), 1)
+        self.assertNotIn("identity_map", serializer.context)
+
+    def test_without_identity_map(self):
+        serializer_class = type(
+            "HouseSerializer", (HouseSerializer,), {"IDENTITY_MAP": False}
+        )
+        serializer = serializer_class(self.house, data=self._get_data())
+        serializer.is_valid(raise_exception=True)
+
+        self.assertEqual(self._count_parent_reads(serializer), 2)
+
+    def test_branches_share_instances(self):
+        data = self._get_data()
+        data["parents"][0]["name"] = "Renamed"
+        data["rooms"][0]["owner"]["name"] = "Renamed"
+        serializer = HouseSerializer(self.house, data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(Parent.objects.get(pk=self.parents[0].pk).name, "Renamed")
+        self.assertEqual(
+            [room["owner"]["name"] for room in serializer.data["rooms"]],
+            ["Renamed", "Parent 1"],
+        )
@@ -0,0 +1,157 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    BULK_REVERSE_RELATIONS = True
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class CustomToySerializer(ToySerializer):
+    def create(self, validated_data):
+        validated_data["name"] = validated_data["name"].upper()
+        return super().create(validated_data)
+
+
+class CustomChildSerializer(ChildSerializer):
+    toys = CustomToySerializer(many=True)
+
+
+class CustomParentSerializer(ParentSerializer):
+    children = CustomChildSerializer(many=True)
+
+
+class LevelPlannerTests(TestCase):
+    def _create_test_data(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.child_1 = Child.objects.create(parent=self.parent, name="Dave Smith")
+        self.child_2 = Child.objects.create(parent=self.parent, name="Tim Smith")
+        self.toy_1 = Toy.objects.create(child=self.child_1, name="Ball")
+        self.toy_2 = Toy.objects.create(child=self.child_1, name="Bike")
+        self.toy_3 = Toy.objects.create(child=self.child_2, name="Drum")
+
+    def test_add__writes_each_depth_in_bulk(self):
+        data = {
+            "name": "Fred Smith",
+            "children": [
+                {
+                    "name": "Child %s" % i,
+                    "toys": [{"name": "Toy %s" % j} for j in range(20)],
+                }
+                for i in range(50)
+            ],
+        }
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        # the toys insert is split in batches depending on the database limits
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+        self.assertLessEqual(len(queries), 10)
+
+        self.assertEqual(Child.objects.count(), 50)
+        self.assertEqual(Toy.objects.count(), 1000)
+
+        child = Child.objects.get(name="Child 3")
+        self.assertEqual(child.toys.count(), 20)
+
+        # primary keys are written back to every depth
+        child_data = serializer.initial_data["children"][3]
+        self.assertEqual(child_data["pk"], child.pk)
+        self.assertEqual(
+            [d["pk"] for d in child_data["toys"]],
+            list(child.toys.order_by("pk").values_list("pk", flat=True)),
+        )
+
+    def test_update__related_entities(self):
+        self._create_test_data()
+        data = {
+            "id": self.parent.pk,
+            "name": "Fred Smith",
+            "children": [
+                {
+                    "id": self.child_1.pk,
+                    "name": "Bob",
+                    "toys": [{"id": self.toy_1.pk, "name": "Drums"}, {"name": "Flute"}],
+                },
+                {"name": "Sally", "toys": [{"name": "Kite"}]},
+            ],
+        }
+        serializer = ParentSerializer(self.parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        Parent.objects.get(id=self.parent.pk, name="Fred Smith")
+        self.assertEqual(
+            list(Child.objects.values_list("name", flat=True)), ["Bob", "Sally"]
+        )
+        self.assertEqual(
+            list(self.child_1.toys.values_list("name", flat=True)), ["Drums", "Flute"]
+        )
+        Toy.objects.get(child__name="Sally", name="Kite")
+
+        # removed children take their toys with them
+        self.assertFalse(Child.objects.filter(pk=self.child_2.pk).exists())
+        self.assertFalse(Toy.objects.filter(pk=self.toy_3.pk).exists())
+        self.assertFalse(Toy.objects.filter(pk=self.toy_2.pk).exists())
+
+    def test_update__removes_stale_rows_once_per_depth(self):
+        self._create_test_data()
+        data = {
+            "id": self.parent.pk,
+            "name": "Fred Smith",
+            "children": [
+                {"id": self.child_1.pk, "name": "Bob", "toys": []},
+                {"id": self.child_2.pk, "name": "Tim", "toys": []},
+            ],
+        }
+        serializer = ParentSerializer(self.parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+
+        self.assertEqual(Child.objects.count(), 2)
+        self.assertEqual(Toy.objects.count(), 0)
+        # The toys of both children are deleted together, no child is deleted
+        deletes = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("DELETE")
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn('"tests_toy"', deletes[0])
+
+    def test_custom_create_is_still_called(self):
+        data = {
+            "name": "Fred Smith",
+            "children": [{"name": "Bobby", "toys": [{"name": "Ball"}]}],
+        }
+        serializer = CustomParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        Toy.objects.get(child__name="Bobby", name="BALL")
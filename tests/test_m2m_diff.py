@@ -0,0 +1,142 @@
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import House, Parent
+
+
+class ParentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Parent
+        fields = ("id", "name")
+
+
+class HouseSerializer(ManyToManySerializer):
+    DIFF_MANY_TO_MANY = True
+
+    parents = ParentSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "parents")
+
+
+class BulkHouseSerializer(HouseSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class HouseNameSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = House
+        fields = ("id", "name")
+
+
+class ParentHousesSerializer(ManyToManySerializer):
+    DIFF_MANY_TO_MANY = True
+
+    house_set = HouseNameSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "house_set")
+
+
+class ManyToManyDiffTests(TestCase):
+    def setUp(self):
+        self.house = House.objects.create(name="94b")
+        self.parents = [Parent.objects.create(name="Parent %s" % i) for i in range(4)]
+        self.house.parents.add(*self.parents[:3])
+
+    def _get_data(self, parents):
+        return {
+            "name": "94b",
+            "parents": [{"pk": parent.pk, "name": parent.name} for parent in parents],
+        }
+
+    def _update(self, serializer_class, parents):
+        serializer = serializer_class(self.house, data=self._get_data(parents))
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_update__adds_and_removes(self):
+        for serializer_class in (HouseSerializer, BulkHouseSerializer):
+            parents = self.parents[1:]
+            self._update(serializer_class, parents)
+            self.assertEqual(list(self.house.parents.all()), parents)
+
+            parents = self.parents[:2]
+            self._update(serializer_class, parents)
+            self.assertEqual(list(self.house.parents.all()), parents)
+
+    def test_update__through_table_queries(self):
+        parents = self.parents[1:]
+        serializer = BulkHouseSerializer(self.house, data=self._get_data(parents))
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertNumQueries(8) as ctx:
+            serializer.save()
+
+        through_queries = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if House.parents.through._meta.db_table in query["sql"]
+        ]
+        # One select of the ids, one insert and one delete
+        self.assertEqual(len(through_queries), 3)
+        self.assertEqual(list(self.house.parents.all()), parents)
+
+    def test_create(self):
+        serializer = HouseSerializer(data=self._get_data(self.parents))
+        serializer.is_valid(raise_exception=True)
+        house = serializer.save()
+
+        self.assertEqual(list(house.parents.all()), self.parents)
+
+    def test_reverse_relation(self):
+        other = House.objects.create(name="12a")
+        data = {"name": "Parent 0", "house_set": [{"pk": other.pk, "name": "12a"}]}
+        serializer = ParentHousesSerializer(self.parents[0], data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(list(self.parents[0].house_set.all()), [other])
+
+    def test_sends_m2m_changed(self):
+        calls = []
+
+        def receiver(action, instance, reverse, model, pk_set, **kwargs):
+            calls.append((action, instance, reverse, model, pk_set))
+
+        m2m_changed.connect(receiver, sender=House.parents.through)
+        try:
+            self._update(HouseSerializer, self.parents[1:])
+        finally:
+            m2m_changed.disconnect(receiver, sender=House.parents.through)
+
+        added = {self.parents[3].pk}
+        removed = {self.parents[0].pk}
+        self.assertEqual(
+            calls,
+            [
+                ("pre_add", self.house, False, Parent, added),
+                ("post_add", self.house, False, Parent, added),
+                ("pre_remove", self.house, False, Parent, removed),
+                ("post_remove", self.house, False, Parent, removed),
+            ],
+        )
+
+    def test_no_change__writes_nothing(self):
+        calls = []
+
+        def receiver(**kwargs):
+            calls.append(kwargs["action"])
+
+        m2m_changed.connect(receiver, sender=House.parents.through)
+        try:
+            self._update(HouseSerializer, self.parents[:3])
+        finally:
+            m2m_changed.disconnect(receiver, sender=House.parents.through)
+
+        self.assertEqual(calls, [])
+        self.assertEqual(list(self.house.parents.all()), self.parents[:3])
@@ -0,0 +1,135 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.bulk import bulk_write
+from rest_serializers.serializers import ManyToManySerializer, NestedListSerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    NATURAL_KEY_FIELDS = ("name", "parent")
+
+    toys = ToySerializer(many=True, required=False)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+        list_serializer_class = NestedListSerializer
+
+
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class NamedToySerializer(ToySerializer):
+    # No unique constraint on the name alone
+    NATURAL_KEY_FIELDS = ("name",)
+
+
+class ToyChildSerializer(ManyToManySerializer):
+    BULK_REVERSE_RELATIONS = True
+
+    toys = NamedToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class NaturalKeyTests(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.children = [
+            Child.objects.create(parent=self.parent, name="Child %s" % i)
+            for i in range(2)
+        ]
+        Toy.objects.create(child=self.children[0], name="Toy")
+
+    def test_rows_are_matched_by_natural_key(self):
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            data = {
+                "name": "Mr Smith",
+                "children": [
+                    {"name": "Child 0", "toys": [{"name": "Toy"}]},
+                    {"name": "Child 2"},
+                ],
+            }
+            serializer = serializer_class(self.parent, data=data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+            children = list(self.parent.children.all())
+            self.assertEqual([child.name for child in children], ["Child 0", "Child 2"])
+            # Matched rather than deleted and inserted again
+            self.assertEqual(children[0].pk, self.children[0].pk)
+            self.assertEqual(data["children"][0]["pk"], self.children[0].pk)
+            self.assertEqual(self.parent.children.get(name="Child 0").toys.count(), 1)
+
+            Child.objects.filter(name="Child 2").delete()
+            Child.objects.create(parent=self.parent, name="Child 1")
+
+    def test_one_lookup_per_level(self):
+        other = Parent.objects.create(name="Mrs Jones")
+        Child.objects.create(parent=other, name="Child 0")
+        data = [
+            {"pk": parent.pk, "name": parent.name, "children": [{"name": "Child 0"}]}
+            for parent in (self.parent, other)
+        ]
+        serializer = ParentSerializer(Parent.objects.all(), data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+
+        lookups = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith('SELECT "tests_child"."id"')
+            and '"tests_child"."name" IN' in query["sql"]
+        ]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(Child.objects.filter(name="Child 0").count(), 2)
+
+    def test_bulk_write_upserts(self):
+        # A row inserted since the lookup is updated rather than duplicated
+        serializer = ChildSerializer(data={"name": "Child 1"})
+        serializer.is_valid(raise_exception=True)
+
+        bulk_write(
+            Child,
+            [(serializer, {"name": "Child 1", "parent": self.parent})],
+            unique_fields=("name", "parent"),
+        )
+
+        self.assertEqual(serializer.instance.pk, self.children[1].pk)
+        self.assertEqual(Child.objects.count(), 2)
+
+    def test_natural_key_without_unique_constraint(self):
+        # Matched by name, and new rows are inserted rather than upserted
+        child = self.children[0]
+        toy = child.toys.get()
+        data = {"name": child.name, "toys": [{"name": "Toy"}, {"name": "Kite"}]}
+        serializer = ToyChildSerializer(child, data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(
+            sorted(child.toys.values_list("name", flat=True)), ["Kite", "Toy"]
+        )
+        self.assertEqual(child.toys.get(name="Toy").pk, toy.pk)
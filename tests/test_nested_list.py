@@ -0,0 +1,136 @@
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from rest_serializers.serializers import ManyToManySerializer, NestedListSerializer
+from rest_serializers.validators import LazyUniqueTogetherValidator
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+        validators = [
+            LazyUniqueTogetherValidator(
+                queryset=model.objects.all(), fields=("name", "parent")
+            )
+        ]
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+        list_serializer_class = NestedListSerializer
+
+
+def get_data(count, prefix="Parent"):
+    return [
+        {
+            "name": "%s %s" % (prefix, i),
+            "children": [
+                {
+                    "name": "Child %s" % j,
+                    "toys": [{"name": "Toy %s" % k} for k in range(2)],
+                }
+                for j in range(3)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+class NestedListSerializerTests(TestCase):
+    def _save(self, data, instance=None):
+        serializer = ParentSerializer(instance, data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_list_serializer_class(self):
+        self.assertIsInstance(ParentSerializer(many=True), NestedListSerializer)
+
+    def test_create(self):
+        parents = self._save(get_data(4))
+
+        self.assertEqual(
+            [parent.name for parent in parents],
+            [
+                "Parent 0",
+                "Parent 1",
+                "Parent 2",
+                "Parent 3",
+            ],
+        )
+        self.assertEqual(Parent.objects.count(), 4)
+        self.assertEqual(Child.objects.count(), 12)
+        self.assertEqual(Toy.objects.count(), 24)
+        for parent in parents:
+            self.assertEqual(parent.children.count(), 3)
+
+    def test_create__queries_dont_grow_with_items(self):
+        serializer = ParentSerializer(data=get_data(2), many=True)
+        serializer.is_valid(raise_exception=True)
+        with self.assertNumQueries(6):
+            serializer.save()
+
+        serializer = ParentSerializer(data=get_data(20, "Other"), many=True)
+        serializer.is_valid(raise_exception=True)
+        with self.assertNumQueries(6):
+            serializer.save()
+
+    def test_update(self):
+        parents = self._save(get_data(2))
+        data = ParentSerializer(parents, many=True).data
+        data = [dict(item) for item in data]
+        data[0]["name"] = "Renamed"
+        data[0]["children"] = data[0]["children"][:1]
+        data.append(get_data(1, "New")[0])
+
+        saved = self._save(data, Parent.objects.all())
+
+        self.assertEqual([parent.pk for parent in saved[:2]], [p.pk for p in parents])
+        self.assertEqual(Parent.objects.get(pk=parents[0].pk).name, "Renamed")
+        self.assertEqual(parents[0].children.count(), 1)
+        self.assertEqual(parents[1].children.count(), 3)
+        self.assertEqual(Parent.objects.count(), 3)
+
+    def test_errors_per_item(self):
+        data = get_data(3)
+        data[1]["children"][2]["name"] = "Child 0"
+        serializer = ParentSerializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertRaises(ValidationError) as ctx:
+            serializer.save()
+
+        errors = ctx.exception.detail
+        self.assertEqual(errors[0], {})
+        self.assertEqual(errors[2], {})
+        self.assertEqual(list(errors[1]), ["children"])
+        self.assertEqual(
+            errors[1]["children"]["non_field_errors"][0].code,
+            "unique",
+        )
+        # Nothing is left of the items written before the error
+        self.assertEqual(Parent.objects.count(), 0)
+        self.assertEqual(Child.objects.count(), 0)
+
+    def test_validation_errors_per_item(self):
+        data = get_data(2)
+        data[0]["name"] = "x" * 30
+        serializer = ParentSerializer(data=data, many=True)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(list(serializer.errors[0]), ["name"])
+        self.assertEqual(serializer.errors[1], {})
@@ -0,0 +1,110 @@
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.profiling import assert_query_budget, profile_queries
+from rest_serializers.serializers import EagerModelSerializer, ManyToManySerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class EagerParentSerializer(EagerModelSerializer):
+    AUTO_EAGER_LOADING = True
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class ProfilingTests(TestCase):
+    def _create_test_data(self):
+        for i in range(3):
+            parent = Parent.objects.create(name="Parent %s" % i)
+            for j in range(2):
+                child = Child.objects.create(parent=parent, name="Child %s" % j)
+                Toy.objects.create(child=child, name="Toy %s" % j)
+
+    def test_read__queries_per_path(self):
+        self._create_test_data()
+
+        with profile_queries() as profile:
+            ParentSerializer(Parent.objects.all(), many=True).data
+
+        self.assertEqual(profile.count(), 10)
+        self.assertEqual(profile.count(""), 1)
+        self.assertEqual(profile.count("children"), 3)
+        self.assertEqual(profile.count("children.toys"), 6)
+        self.assertEqual(
+            sorted(
+                (path, count) for (path, _), count in profile.get_repeated().items()
+            ),
+            [("children", 3), ("children.toys", 6)],
+        )
+        self.assertIn("children.toys: 6 queries", profile.report())
+
+    def test_read__eager_loading_within_budget(self):
+        self._create_test_data()
+        queryset = EagerParentSerializer.setup_eager_loading(Parent.objects.all())
+
+        with assert_query_budget(3, allow_repeated=False) as profile:
+            EagerParentSerializer(queryset, many=True).data
+
+        self.assertEqual(profile.get_repeated(), {})
+
+    def test_write__queries_per_path(self):
+        data = {
+            "name": "Mr Smith",
+            "children": [
+                {"name": "Dave", "toys": [{"name": "Ball"}, {"name": "Kite"}]},
+                {"name": "Tim", "toys": []},
+            ],
+        }
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        with profile_queries() as profile:
+            serializer.save()
+
+        self.assertEqual(
+            [
+                query.sql.split()[0]
+                for query in profile.queries
+                if query.path == "children.toys"
+            ],
+            ["INSERT", "INSERT"],
+        )
+        self.assertTrue(
+            any(
+                query.sql.startswith("INSERT")
+                for query in profile.by_path()["children"]
+            )
+        )
+
+    def test_budget_exceeded(self):
+        self._create_test_data()
+
+        with self.assertRaisesMessage(AssertionError, "children.toys: 6 queries"):
+            with assert_query_budget({"children.toys": 1}):
+                ParentSerializer(Parent.objects.all(), many=True).data
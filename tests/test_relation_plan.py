@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class DynamicParentSerializer(ParentSerializer):
+    def __init__(self, *args, **kwargs):
+        without_children = kwargs.pop("without_children", False)
+        super().__init__(*args, **kwargs)
+        if without_children:
+            self.fields.pop("children")
+
+
+class RelationPlanTests(TestCase):
+    def test_plan(self):
+        (relation,) = ParentSerializer().get_relation_plan()
+
+        self.assertEqual(relation.field_name, "children")
+        self.assertEqual(relation.source, "children")
+        self.assertEqual(relation.related_field, Child._meta.get_field("parent"))
+        self.assertFalse(relation.direct)
+        self.assertEqual(relation.kind, "many_to_one")
+        self.assertTrue(relation.many)
+        self.assertIs(relation.serializer_class, ChildSerializer)
+
+    def test_plan_is_cached_per_class(self):
+        plan = ParentSerializer().get_relation_plan()
+
+        with mock.patch.object(ParentSerializer, "_get_related_field") as get:
+            self.assertIs(ParentSerializer().get_relation_plan(), plan)
+            get.assert_not_called()
+
+    def test_plan_is_not_shared_between_classes(self):
+        self.assertNotEqual(
+            ParentSerializer().get_relation_plan(),
+            ChildSerializer().get_relation_plan(),
+        )
+
+    def test_plan_follows_dynamic_fields(self):
+        self.assertEqual(len(DynamicParentSerializer().get_relation_plan()), 1)
+        self.assertEqual(
+            DynamicParentSerializer(without_children=True).get_relation_plan(), ()
+        )
+        self.assertEqual(len(DynamicParentSerializer().get_relation_plan()), 1)
+
+    def test_save_uses_plan(self):
+        data = {"name": "Fred Smith", "children": [{"name": "Bobby", "toys": []}]}
+        ParentSerializer().get_relation_plan()
+        ChildSerializer().get_relation_plan()
+
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        with (
+            mock.patch.object(ParentSerializer, "_get_related_field") as get_parent,
+            mock.patch.object(ChildSerializer, "_get_related_field") as get_child,
+        ):
+            serializer.save()
+            get_parent.assert_not_called()
+            get_child.assert_not_called()
+
+        Child.objects.get(parent__name="Fred Smith", name="Bobby")
@@ -0,0 +1,184 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.cache import DjangoCache, LRUCache
+from rest_serializers.serializers import EagerModelSerializer, ManyToManySerializer
+from tests.models import Child, House, Parent, Toy
+
+lru_cache = LRUCache(max_size=100)
+django_cache = DjangoCache()
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    REPRESENTATION_CACHE = lru_cache
+
+    children = ChildSerializer(many=True)
+    house_set = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children", "house_set")
+
+
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class DjangoCacheParentSerializer(EagerModelSerializer):
+    REPRESENTATION_CACHE = django_cache
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class DynamicParentSerializer(EagerModelSerializer):
+    REPRESENTATION_CACHE = lru_cache
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name in set(self.fields) - set(fields or self.fields):
+            self.fields.pop(field_name)
+
+
+class RepresentationCacheTests(TestCase):
+    def setUp(self):
+        lru_cache.clear()
+        cache.clear()
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.child = Child.objects.create(parent=self.parent, name="Dave")
+        self.toy = Toy.objects.create(child=self.child, name="Ball")
+
+    def _get_data(self, serializer_class=ParentSerializer):
+        return serializer_class(Parent.objects.get(pk=self.parent.pk)).data
+
+    def test_hit(self):
+        expected = self._get_data()
+        hits = lru_cache.hits
+
+        # only the parent is fetched
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get_data(), expected)
+
+        self.assertEqual(lru_cache.hits, hits + 1)
+        self.assertGreater(lru_cache.stats()["hit_rate"], 0)
+
+    def test_invalidated_on_save(self):
+        self._get_data()
+        self.toy.name = "Kite"
+        self.toy.save()
+
+        self.assertEqual(self._get_data()["children"][0]["toys"][0]["name"], "Kite")
+
+    def test_invalidated_on_delete(self):
+        self._get_data()
+        self.toy.delete()
+
+        self.assertEqual(self._get_data()["children"][0]["toys"], [])
+
+    def test_invalidated_on_m2m_change(self):
+        self._get_data()
+        house = House.objects.create(name="94b")
+        house.parents.add(self.parent)
+
+        self.assertEqual(self._get_data()["house_set"], [house.pk])
+
+    def test_invalidated_on_bulk_write(self):
+        self._get_data(BulkParentSerializer)
+        data = {
+            "id": self.parent.pk,
+            "name": "Mr Smith",
+            "children": [{"id": self.child.pk, "name": "David", "toys": []}],
+        }
+        serializer = BulkParentSerializer(self.parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        version = lru_cache.versions["tests.Child"]
+        serializer.save()
+
+        # children are written with bulk_update, without post_save
+        self.assertGreater(lru_cache.versions["tests.Child"], version)
+        self.assertEqual(
+            self._get_data(BulkParentSerializer)["children"][0]["name"], "David"
+        )
+
+    def test_changing_data_leaves_cache(self):
+        for serializer_class in (ParentSerializer, DjangoCacheParentSerializer):
+            queryset = Parent.objects.all()
+            serializer_class(queryset, many=True).data[0]["name"] = "Changed"
+            data = serializer_class(queryset, many=True).data
+            data[0]["children"][0]["name"] = "Changed"
+
+            data = serializer_class(queryset, many=True).data
+            self.assertEqual(data[0]["name"], "Mr Smith")
+            self.assertEqual(data[0]["children"][0]["name"], "Dave")
+
+    def test_versions_read_once_per_list(self):
+        for i in range(5):
+            Parent.objects.create(name="Parent %s" % i)
+
+        with mock.patch.object(
+            django_cache, "get_versions", wraps=django_cache.get_versions
+        ) as get_versions:
+            data = DjangoCacheParentSerializer(Parent.objects.all(), many=True).data
+
+        self.assertEqual(len(data), 6)
+        # Once for the list rather than once per row
+        self.assertEqual(get_versions.call_count, 1)
+
+    def test_field_sets_are_cached_apart(self):
+        parent = Parent.objects.get(pk=self.parent.pk)
+        self.assertEqual(
+            DynamicParentSerializer(parent, fields=["id"]).data, {"id": parent.pk}
+        )
+
+        data = DynamicParentSerializer(parent).data
+        self.assertEqual(data["name"], "Mr Smith")
+        self.assertEqual(data["children"][0]["name"], "Dave")
+        self.assertEqual(
+            DynamicParentSerializer(parent, fields=["id"]).data, {"id": parent.pk}
+        )
+
+    def test_lru_eviction(self):
+        backend = LRUCache(max_size=2)
+        for key in ("a", "b", "c"):
+            backend.set(key, key)
+        backend.get("b")
+        backend.set("d", "d")
+
+        self.assertEqual(list(backend.entries), ["b", "d"])
+
+    def test_django_cache(self):
+        expected = self._get_data(DjangoCacheParentSerializer)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get_data(DjangoCacheParentSerializer), expected)
+
+        Toy.objects.create(child=self.child, name="Kite")
+        self.assertEqual(
+            len(self._get_data(DjangoCacheParentSerializer)["children"][0]["toys"]), 2
+        )
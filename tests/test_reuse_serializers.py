@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from rest_serializers.serializers import ManyToManySerializer
+from rest_serializers.validators import LazyUniqueTogetherValidator
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+        validators = [
+            LazyUniqueTogetherValidator(
+                queryset=model.objects.all(), fields=("name", "parent")
+            )
+        ]
+
+
+class ParentSerializer(ManyToManySerializer):
+    REUSE_NESTED_SERIALIZERS = True
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class ReuseSerializersTests(TestCase):
+    def _create_test_data(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        self.child_1 = Child.objects.create(parent=self.parent, name="Dave Smith")
+        self.child_2 = Child.objects.create(parent=self.parent, name="Tim Smith")
+        self.toy_1 = Toy.objects.create(child=self.child_1, name="Ball")
+        self.toy_2 = Toy.objects.create(child=self.child_2, name="Bike")
+
+    def _get_data(self):
+        return {
+            "id": self.parent.pk,
+            "name": "Fred Smith",
+            "children": [
+                {
+                    "id": self.child_1.pk,
+                    "name": "Bob",
+                    "toys": [{"id": self.toy_1.pk, "name": "Drums"}, {"name": "Flute"}],
+                },
+                {"name": "Sally", "toys": [{"name": "Kite"}, {"name": "Yoyo"}]},
+            ],
+        }
+
+    def _assert_saved(self):
+        Parent.objects.get(pk=self.parent.pk, name="Fred Smith")
+        self.assertEqual(
+            list(Child.objects.values_list("name", flat=True)), ["Bob", "Sally"]
+        )
+        self.assertEqual(
+            list(Toy.objects.filter(child=self.child_1).values_list("name", flat=True)),
+            ["Drums", "Flute"],
+        )
+        self.assertEqual(
+            list(
+                Toy.objects.filter(child__name="Sally").values_list("name", flat=True)
+            ),
+            ["Kite", "Yoyo"],
+        )
+
+    def test_one_serializer_per_nested_field(self):
+        self._create_test_data()
+        serializer = ParentSerializer(self.parent, data=self._get_data())
+        self.assertTrue(serializer.is_valid())
+
+        with (
+            mock.patch.object(
+                ChildSerializer,
+                "__init__",
+                autospec=True,
+                side_effect=ChildSerializer.__init__,
+            ) as child_init,
+            mock.patch.object(
+                ToySerializer,
+                "__init__",
+                autospec=True,
+                side_effect=ToySerializer.__init__,
+            ) as toy_init,
+        ):
+            serializer.save()
+
+        # the pooled serializers, the toys one is also built once as a declared
+        # field of the pooled child serializer
+        self.assertEqual(child_init.call_count, 1)
+        self.assertEqual(toy_init.call_count, 2)
+        self._assert_saved()
+
+    def test_one_serializer_per_nested_field__bulk(self):
+        self._create_test_data()
+        serializer = BulkParentSerializer(self.parent, data=self._get_data())
+        self.assertTrue(serializer.is_valid())
+
+        with mock.patch.object(
+            ToySerializer, "__init__", autospec=True, side_effect=ToySerializer.__init__
+        ) as toy_init:
+            serializer.save()
+
+        self.assertEqual(toy_init.call_count, 2)
+        self._assert_saved()
+
+    def test_unique_together_is_validated_per_parent(self):
+        data = {
+            "name": "Freddy Star",
+            "children": [
+                {"name": "Sally", "toys": []},
+                {"name": "Sally", "toys": []},
+            ],
+        }
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaises(ValidationError):
+            serializer.save()
+
+        # the same name is valid under another parent
+        other = Parent.objects.create(name="Mr Smith")
+        Child.objects.create(parent=other, name="Sally")
+        data = {"name": "Freddy Star", "children": [{"name": "Sally", "toys": []}]}
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(Child.objects.filter(name="Sally").count(), 2)
@@ -0,0 +1,77 @@
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class SavepointTests(TestCase):
+    data = {
+        "name": "Mr Smith",
+        "children": [
+            {"name": "Child %s" % i, "toys": [{"name": "Toy"}]} for i in range(3)
+        ],
+    }
+
+    def _count_savepoints(self):
+        serializer = ParentSerializer(data=self.data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+
+        self.assertEqual(Child.objects.count(), 3)
+        self.assertEqual(Toy.objects.count(), 3)
+        return sum(
+            query["sql"].startswith("SAVEPOINT") for query in ctx.captured_queries
+        )
+
+    def test_nested_savepoints(self):
+        # The parent and each child
+        self.assertEqual(self._count_savepoints(), 4)
+
+    @override_settings(REST_SERIALIZERS={"NESTED_SAVEPOINTS": False})
+    def test_without_nested_savepoints(self):
+        # The children join the transaction of the parent
+        self.assertEqual(self._count_savepoints(), 1)
+
+    @override_settings(REST_SERIALIZERS={"NESTED_SAVEPOINTS": False})
+    def test_without_nested_savepoints__rolls_back_everything(self):
+        data = {
+            "name": "Mr Smith",
+            "children": [
+                {"name": "Child", "toys": []},
+                {"name": "Child", "toys": []},
+            ],
+        }
+        serializer = ParentSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertRaises(IntegrityError):
+            serializer.save()
+
+        self.assertEqual(Parent.objects.count(), 0)
+        self.assertEqual(Child.objects.count(), 0)
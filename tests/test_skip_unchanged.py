@@ -0,0 +1,141 @@
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from rest_serializers.serializers import ManyToManySerializer
+from rest_serializers.utils import is_unchanged
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(ManyToManySerializer):
+    SKIP_UNCHANGED_ROWS = True
+
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(ManyToManySerializer):
+    SKIP_UNCHANGED_ROWS = True
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class BulkChildSerializer(ChildSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+    children = BulkChildSerializer(many=True)
+
+
+class SkipUnchangedRowsTests(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+        for i in range(2):
+            child = Child.objects.create(parent=self.parent, name="Child %s" % i)
+            for j in range(3):
+                Toy.objects.create(child=child, name="Toy %s%s" % (i, j))
+
+    def _get_data(self):
+        return {
+            "name": self.parent.name,
+            "children": [
+                {
+                    "pk": child.pk,
+                    "name": child.name,
+                    "toys": [
+                        {"pk": toy.pk, "name": toy.name} for toy in child.toys.all()
+                    ],
+                }
+                for child in self.parent.children.all()
+            ],
+        }
+
+    def _save(self, serializer_class, data):
+        serializer = serializer_class(self.parent, data=data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+        return [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+
+    def test_is_unchanged(self):
+        toy = Toy.objects.first()
+        self.assertTrue(is_unchanged(toy, {"name": toy.name, "child": toy.child}))
+        self.assertFalse(is_unchanged(toy, {"name": "Other"}))
+        self.assertFalse(is_unchanged(toy, {"child": Child.objects.last()}))
+        self.assertFalse(is_unchanged(Toy(name=toy.name), {"name": toy.name}))
+        self.assertFalse(is_unchanged(toy.child, {"toys": []}))
+
+    def test_skips_unchanged_toys(self):
+        data = self._get_data()
+        data["children"][1]["toys"][2]["name"] = "New toy"
+
+        saved = []
+
+        def receiver(instance, **kwargs):
+            saved.append(instance)
+
+        post_save.connect(receiver, sender=Toy)
+        try:
+            updates = self._save(ParentSerializer, data)
+        finally:
+            post_save.disconnect(receiver, sender=Toy)
+
+        self.assertEqual([toy.name for toy in saved], ["New toy"])
+        # The parent, both children, which hold nested toys, and one toy
+        self.assertEqual(len(updates), 4)
+        self.assertEqual(Toy.objects.filter(name="New toy").count(), 1)
+        self.assertEqual(Toy.objects.count(), 6)
+
+    def test_bulk__skips_unchanged_rows(self):
+        data = self._get_data()
+        data["children"][1]["toys"][2]["name"] = "New toy"
+
+        updates = self._save(BulkParentSerializer, data)
+
+        # The parent and one bulk update of the changed toy
+        self.assertEqual(len(updates), 2)
+        self.assertIn("New toy", updates[1])
+        self.assertEqual(Toy.objects.filter(name="New toy").count(), 1)
+
+    def test_bulk__nothing_changed(self):
+        updates = self._save(BulkParentSerializer, self._get_data())
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Toy.objects.count(), 6)
+
+    def test_new_and_removed_rows(self):
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            data = self._get_data()
+            toys = data["children"][0]["toys"]
+            toys.pop(0)
+            toys.append({"name": "Added %s" % len(toys)})
+
+            self._save(serializer_class, data)
+
+            child = self.parent.children.first()
+            self.assertEqual(
+                [toy.name for toy in child.toys.all()],
+                sorted(toy["name"] for toy in toys),
+            )
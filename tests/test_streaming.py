@@ -0,0 +1,71 @@
+import json
+
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import EagerModelSerializer
+from tests.models import Child, Parent, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name")
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(EagerModelSerializer):
+    PREFETCH_RELATED_FIELDS = ["children__toys"]
+    STREAM_CHUNK_SIZE = 2
+
+    children = ChildSerializer(many=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children")
+
+
+class StreamingTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            parent = Parent.objects.create(name="Parent %s" % i)
+            for j in range(2):
+                child = Child.objects.create(parent=parent, name="Child %s" % j)
+                Toy.objects.create(child=child, name="Toy %s" % j)
+
+        queryset = ParentSerializer.setup_eager_loading(Parent.objects.all())
+        self.expected = ParentSerializer(queryset, many=True).data
+
+    def test_stream(self):
+        stream = ParentSerializer.stream(Parent.objects.all())
+
+        # parents and, for each of the 3 chunks, the children and their toys
+        with self.assertNumQueries(7):
+            data = list(stream)
+
+        self.assertEqual(data, self.expected)
+
+    def test_stream_json(self):
+        chunks = list(ParentSerializer.stream_json(Parent.objects.all()))
+
+        # brackets and 3 chunks
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(
+            json.loads(b"".join(chunks)), json.loads(json.dumps(self.expected))
+        )
+
+    def test_stream_json__empty(self):
+        response = StreamingHttpResponse(
+            ParentSerializer.stream_json(Parent.objects.none()),
+            content_type="application/json",
+        )
+
+        self.assertEqual(b"".join(response.streaming_content), b"[]")
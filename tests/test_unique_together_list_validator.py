@@ -0,0 +1,62 @@
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import UniqueTogetherListSerializer
+from tests.models import Child, Parent
+
+MESSAGE = "The fields name, parent must make a unique set."
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Child
+        fields = ("id", "name", "parent")
+        list_serializer_class = UniqueTogetherListSerializer
+
+
+class UniqueTogetherListTests(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name="Mr Smith")
+
+    def test_validates_list_with_one_query(self):
+        data = [{"name": "Child %s" % i, "parent": self.parent.pk} for i in range(20)]
+        serializer = ChildSerializer(data=data, many=True)
+
+        # one parent lookup per item and one unique together check
+        with self.assertNumQueries(21):
+            self.assertTrue(serializer.is_valid())
+
+    def test_duplicates_in_list(self):
+        data = [
+            {"name": "Dave", "parent": self.parent.pk},
+            {"name": "Dave", "parent": self.parent.pk},
+        ]
+        serializer = ChildSerializer(data=data, many=True)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, [{}, {"non_field_errors": [MESSAGE]}])
+
+    def test_duplicates_in_database(self):
+        Child.objects.create(parent=self.parent, name="Tim")
+        other = Parent.objects.create(name="Mrs Jones")
+        data = [
+            {"name": "Dave", "parent": self.parent.pk},
+            {"name": "Tim", "parent": self.parent.pk},
+            {"name": "Tim", "parent": other.pk},
+        ]
+        serializer = ChildSerializer(data=data, many=True)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, [{}, {"non_field_errors": [MESSAGE]}, {}])
+
+    def test_child_keeps_its_validators(self):
+        Child.objects.create(parent=self.parent, name="Tim")
+        list_serializer = ChildSerializer(
+            data=[{"name": "Dave", "parent": self.parent.pk}], many=True
+        )
+        self.assertTrue(list_serializer.is_valid())
+        self.assertEqual(len(list_serializer.child.validators), 1)
+
+        serializer = ChildSerializer(data={"name": "Tim", "parent": self.parent.pk})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"non_field_errors": [MESSAGE]})
@@ -32,6 +32,34 @@ class ParentSerializer(ManyToManySerializer):
         fields = ("id", "name", "children")
 
 
+class BulkParentSerializer(ParentSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
+class ParentCheckingChildSerializer(ChildSerializer):
+    def validate(self, attrs):
+        # The lazy unique together gives the row its parent once it is saved,
+        # it is missing when the parent serializer is validated
+        parent = attrs.get("parent")
+        if parent is not None and attrs["name"] == parent.name:
+            raise serializers.ValidationError("A child can't share its parent's name")
+        return attrs
+
+    class Meta(ChildSerializer.Meta):
+        pass
+
+
+class ParentCheckingSerializer(ParentSerializer):
+    children = ParentCheckingChildSerializer(many=True)
+
+    class Meta(ParentSerializer.Meta):
+        pass
+
+
+class BulkParentCheckingSerializer(ParentCheckingSerializer):
+    BULK_REVERSE_RELATIONS = True
+
+
 class UniqueTogetherTests(TestCase):
     def test_can_validate_and_save(self):
         data = {"name": "Freddy Star", "children": [{"name": "Bob"}, {"name": "Sally"}]}
@@ -115,3 +143,178 @@ class UniqueTogetherTests(TestCase):
         # correct rows exist
         self.assertEqual(Parent.objects.count(), 1)
         self.assertEqual(Child.objects.count(), 1)
+
+    def test_validates_all_rows_with_one_query(self):
+        parent = Parent.objects.create(name="Freddy Star")
+        data = {
+            "id": parent.pk,
+            "name": parent.name,
+            "children": [{"name": "Child %s" % i} for i in range(20)],
+        }
+
+        serializer = ParentSerializer(instance=parent, data=data)
+        self.assertTrue(serializer.is_valid())
+
+        # savepoint, parent update, unique together check, 20 inserts,
+        # stale children select, release
+        with self.assertNumQueries(25):
+            serializer.save()
+
+        self.assertEqual(Child.objects.count(), 20)
+
+    def test_same_values_under_another_parent_are_valid(self):
+        other = Parent.objects.create(name="Mr Smith")
+        Child.objects.create(name="Sally", parent=other)
+
+        data = {"name": "Freddy Star", "children": [{"name": "Sally"}]}
+        serializer = ParentSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(Child.objects.filter(name="Sally").count(), 2)
+
+    def test_renaming_existing_rows_is_valid(self):
+        parent = Parent.objects.create(name="Freddy Star")
+        bob = Child.objects.create(name="Bob", parent=parent)
+
+        data = {
+            "id": parent.pk,
+            "name": parent.name,
+            "children": [{"id": bob.pk, "name": "Robert"}, {"name": "Bob"}],
+        }
+        serializer = ParentSerializer(instance=parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(
+            list(parent.children.values_list("name", flat=True)), ["Bob", "Robert"]
+        )
+
+    def test_renaming_existing_rows_is_valid__bulk(self):
+        # The rename is written before the new row takes the old name
+        parent = Parent.objects.create(name="Freddy Star")
+        bob = Child.objects.create(name="Bob", parent=parent)
+
+        data = {
+            "id": parent.pk,
+            "name": parent.name,
+            "children": [{"id": bob.pk, "name": "Robert"}, {"name": "Bob"}],
+        }
+        serializer = BulkParentSerializer(instance=parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.assertEqual(
+            list(parent.children.values_list("name", flat=True)), ["Bob", "Robert"]
+        )
+        Child.objects.get(pk=bob.pk, name="Robert")
+
+    def test_bulk_invalidates_correctly(self):
+        parent = Parent.objects.create(name="Freddy Star")
+        child = Child.objects.create(name="Bob", parent=parent)
+
+        data = {
+            "id": parent.pk,
+            "name": parent.name,
+            "children": [{"id": child.pk, "name": child.name}, {"name": child.name}],
+        }
+        serializer = BulkParentSerializer(instance=parent, data=data)
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaises(ValidationError) as cm:
+            serializer.save()
+
+        self.assertEqual(
+            cm.exception.detail,
+            {"non_field_errors": ["The fields name, parent must make a unique set."]},
+        )
+        self.assertEqual(Child.objects.count(), 1)
+
+    def _rename(self, serializer_class, parent, renames):
+        data = {
+            "id": parent.pk,
+            "name": parent.name,
+            "children": [{"id": child.pk, "name": name} for child, name in renames],
+        }
+        serializer = serializer_class(instance=parent, data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+    def test_swapping_values_is_invalid(self):
+        # Saved one after the other, the first row takes a name still held
+        parent = Parent.objects.create(name="Freddy Star")
+        a = Child.objects.create(name="A", parent=parent)
+        b = Child.objects.create(name="B", parent=parent)
+
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            with self.assertRaises(ValidationError) as cm:
+                self._rename(serializer_class, parent, [(a, "B"), (b, "A")])
+
+            self.assertEqual(
+                cm.exception.detail,
+                {
+                    "non_field_errors": [
+                        "The fields name, parent must make a unique set."
+                    ]
+                },
+            )
+            self.assertEqual(
+                list(parent.children.values_list("name", flat=True)), ["A", "B"]
+            )
+
+    def test_rename_chain_is_valid(self):
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            parent = Parent.objects.create(name=serializer_class.__name__)
+            a = Child.objects.create(name="A", parent=parent)
+            c = Child.objects.create(name="C", parent=parent)
+
+            self._rename(serializer_class, parent, [(c, "D"), (a, "C")])
+
+            Child.objects.get(pk=a.pk, name="C")
+            Child.objects.get(pk=c.pk, name="D")
+
+    def test_rename_chain_out_of_order_is_invalid(self):
+        parent = Parent.objects.create(name="Freddy Star")
+        a = Child.objects.create(name="A", parent=parent)
+        c = Child.objects.create(name="C", parent=parent)
+
+        for serializer_class in (ParentSerializer, BulkParentSerializer):
+            with self.assertRaises(ValidationError):
+                self._rename(serializer_class, parent, [(a, "C"), (c, "D")])
+
+            self.assertEqual(
+                list(parent.children.values_list("name", flat=True)), ["A", "C"]
+            )
+
+    def test_validate_sees_the_parent(self):
+        for serializer_class in (
+            ParentCheckingSerializer,
+            BulkParentCheckingSerializer,
+        ):
+            parent = Parent.objects.create(name="Freddy Star")
+            data = {
+                "id": parent.pk,
+                "name": parent.name,
+                "children": [{"name": "Bob"}, {"name": parent.name}],
+            }
+            serializer = serializer_class(instance=parent, data=data)
+            self.assertTrue(serializer.is_valid())
+
+            with self.assertRaises(ValidationError) as cm:
+                serializer.save()
+
+            self.assertEqual(
+                cm.exception.detail,
+                {"non_field_errors": ["A child can't share its parent's name"]},
+            )
+            self.assertFalse(parent.children.exists())
+
+            # The parent is not part of the representation
+            data["children"].pop()
+            serializer = serializer_class(instance=parent, data=data)
+            self.assertTrue(serializer.is_valid())
+            serializer.save()
+            self.assertEqual(
+                [child["name"] for child in serializer.data["children"]], ["Bob"]
+            )
+            self.assertNotIn("parent", serializer.data["children"][0])
@@ -0,0 +1,130 @@
+from django.test import TestCase
+from rest_framework import serializers
+
+from rest_serializers.serializers import EagerModelSerializer
+from tests.models import Child, Document, House, Parent, Room, Toy
+
+
+class ToySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Toy
+        fields = ("id", "name", "child")
+
+
+class ChildSerializer(serializers.ModelSerializer):
+    toys = ToySerializer(many=True)
+
+    class Meta:
+        model = Child
+        fields = ("id", "name", "toys")
+
+
+class ParentSerializer(EagerModelSerializer):
+    PREFETCH_RELATED_FIELDS = ["children__toys", "house_set"]
+
+    children = ChildSerializer(many=True)
+    house_set = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Parent
+        fields = ("id", "name", "children", "house_set")
+
+
+class RoomSerializer(EagerModelSerializer):
+    SELECT_RELATED_FIELDS = ["owner"]
+    PREFETCH_RELATED_FIELDS = ["owner__children__toys", "owner__house_set"]
+
+    owner = ParentSerializer()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "house", "owner")
+
+
+class MethodRoomSerializer(EagerModelSerializer):
+    owner = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Room
+        fields = ("id", "name", "owner")
+
+    def get_owner(self, room):
+        return room.owner_id
+
+
+class DocumentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Document
+        fields = ("id", "file")
+
+
+class HouseSerializer(EagerModelSerializer):
+    documents = DocumentSerializer(many=True)
+
+    class Meta:
+        model = House
+        fields = ("id", "name", "documents")
+
+
+class ValuesRepresentationTests(TestCase):
+    def setUp(self):
+        house = House.objects.create(name="94b")
+        other = House.objects.create(name="12a")
+        for i in range(3):
+            parent = Parent.objects.create(name="Parent %s" % i)
+            house.parents.add(parent)
+            if i:
+                other.parents.add(parent)
+            Room.objects.create(
+                house=house, owner=parent if i else None, name="Room %s" % i
+            )
+            for j in range(2):
+                child = Child.objects.create(parent=parent, name="Child %s" % (2 - j))
+                Toy.objects.create(child=child, name="Toy %s" % (2 - j))
+        Parent.objects.create(name="Parent 3")
+
+    def _get_data(self, serializer_class, model_class):
+        queryset = serializer_class.setup_eager_loading(model_class.objects.all())
+        return serializer_class(queryset, many=True).data
+
+    def test_read_values(self):
+        expected = self._get_data(ParentSerializer, Parent)
+
+        # parents, children with their toys and houses
+        with self.assertNumQueries(4):
+            data = ParentSerializer.read_values(Parent.objects.all())
+
+        self.assertEqual(data, expected)
+        self.assertEqual(data[3]["children"], [])
+
+    def test_read_values__nested(self):
+        expected = self._get_data(RoomSerializer, Room)
+
+        # rooms with their owner, children, toys and houses
+        with self.assertNumQueries(4):
+            data = RoomSerializer.read_values(Room.objects.all())
+
+        self.assertEqual(data, expected)
+        self.assertIsNone(data[0]["owner"])
+
+    def test_read_values__filtered(self):
+        data = ParentSerializer.read_values(Parent.objects.filter(name="Parent 1"))
+
+        self.assertEqual([d["name"] for d in data], ["Parent 1"])
+        self.assertEqual(
+            [c["name"] for c in data[0]["children"]], ["Child 1", "Child 2"]
+        )
+
+    def test_read_values__falls_back(self):
+        self.assertEqual(
+            MethodRoomSerializer.read_values(Room.objects.all()),
+            self._get_data(MethodRoomSerializer, Room),
+        )
+
+    def test_read_values__files(self):
+        # A file is represented from the attribute of the instance
+        Document.objects.create(house=House.objects.get(name="94b"), file="x/a.txt")
+        data = HouseSerializer.read_values(House.objects.all())
+
+        self.assertEqual(data, self._get_data(HouseSerializer, House))
+        self.assertTrue(data[1]["documents"][0]["file"].endswith("x/a.txt"))